@@ -0,0 +1,63 @@
+import numpy as np
+
+from skipbo.game.skipbo_game import NR_OF_ACTIONS
+
+PACKED_ACTION_MASK_SIZE = NR_OF_ACTIONS // 8
+
+
+class ActionMask:
+    """
+    Conversions of the 80 bit action masks of SkipBoGame, where bit 8 * play_from + play_to is set for every
+    playable action.
+    """
+
+    @staticmethod
+    def pack(mask):
+        """
+        Return the action mask as 10 bytes, in the same little endian bit order as np.packbits(..., bitorder='little').
+        """
+        return np.frombuffer(mask.to_bytes(PACKED_ACTION_MASK_SIZE, 'little'), dtype=np.uint8)
+
+    @staticmethod
+    def pack_array(masks):
+        """
+        Return bool arrays of 80 actions packed to 10 bytes along the last axis.
+        """
+        return np.packbits(masks, axis=-1, bitorder='little')
+
+    @staticmethod
+    def unpack(packed_masks):
+        """
+        Return a bool array with the last axis of 10 bytes unpacked to 80 actions.
+        """
+        return np.unpackbits(packed_masks, axis=-1, count=NR_OF_ACTIONS, bitorder='little').astype(bool)
+
+    @staticmethod
+    def to_array(mask, out=None):
+        """
+        Return the action mask as a bool array of 80 actions. When out is given the mask is written into it.
+        """
+        if out is None:
+            out = np.empty(NR_OF_ACTIONS, dtype=bool)
+        out[:] = ActionMask.unpack(ActionMask.pack(mask))
+        return out
+
+    @staticmethod
+    def from_actions(actions):
+        """
+        Return a bool array of 80 actions in which the given action indices are set.
+        """
+        mask = np.zeros(NR_OF_ACTIONS, dtype=bool)
+        mask[actions] = True
+        return mask
+
+    @staticmethod
+    def from_agent_arguments(allowed_actions, extra):
+        """
+        Return the bool action mask that the environment passes to Agent.action in extra, or build it from the
+        allowed actions when the environment does not provide one.
+        """
+        if extra is not None and "action_mask" in extra:
+            return extra["action_mask"]
+        else:
+            return ActionMask.from_actions(allowed_actions)
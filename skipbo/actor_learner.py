@@ -0,0 +1,192 @@
+import multiprocessing
+import queue
+
+import numpy as np
+
+from skipbo.numpy_model import NumpyModel
+from skipbo.q_functions import QFunctions
+from skipbo.state_transition import StateTransition
+from skipbo.vector_skipbo_env import VectorSkipboEnv
+
+# Seconds to wait for the transitions of a game before checking that the actors are still running
+TRANSITION_TIMEOUT = 1.0
+
+
+class VectorActor:
+    """
+    Plays a number of self-play games in lockstep in a VectorSkipboEnv and chooses the epsilon greedy actions of all
+    games with one batched forward pass of a NumpyModel snapshot of the learners' weights. It collects the state
+    transitions of both players of every game, as two DqnAgents would see them, instead of training on them.
+    """
+
+    def __init__(self, model, epsilon, minimum_epsilon, epsilon_decay_factor_per_episode, nr_of_games, seed=None):
+        self.model = model
+        self.epsilon = epsilon
+        self.minimum_epsilon = minimum_epsilon
+        self.epsilon_decay_factor_per_episode = epsilon_decay_factor_per_episode
+        self.environment = VectorSkipboEnv(nr_of_games, seed)
+        self.observations, self.action_masks = self.environment.reset()
+        # Per game and seat: the last observation and action of the player and the rewards since that action
+        self.previous_observations = [[None, None] for _ in range(nr_of_games)]
+        self.previous_actions = [[None, None] for _ in range(nr_of_games)]
+        self.accumulated_rewards = np.zeros((nr_of_games, 2))
+        self.episode_rewards = np.zeros((nr_of_games, 2))
+        self.transitions = [[] for _ in range(nr_of_games)]
+
+    def step(self):
+        """
+        Play one action in every game. Returns the transitions, the epsilon of the next game and the rewards of both
+        players of every game that finished in this step.
+        """
+        q_values = QFunctions.get_multiple_q_values(self.model, self.observations)
+        actions = QFunctions.select_actions_epsilon_greedy(q_values, self.epsilon, self.action_masks)
+
+        for index, player in enumerate(self.environment.current_players):
+            if self.previous_observations[index][player] is not None:
+                self.__add_transition(
+                    index, player, np.flatnonzero(self.action_masks[index]).tolist(), self.observations[index], False)
+            self.previous_observations[index][player] = self.observations[index]
+            self.previous_actions[index][player] = int(actions[index])
+            self.accumulated_rewards[index, player] = 0
+
+        self.observations, self.action_masks, rewards, dones = self.environment.step(actions)
+        self.accumulated_rewards += rewards
+
+        finished_games = []
+        for index in np.flatnonzero(dones):
+            for player in range(2):
+                if self.previous_observations[index][player] is not None:
+                    self.__add_transition(index, player, [], self.previous_observations[index][player], True)
+            self.epsilon = max(self.minimum_epsilon, self.epsilon * self.epsilon_decay_factor_per_episode)
+            finished_games.append((self.transitions[index], self.epsilon, self.episode_rewards[index].tolist()))
+            self.__reset_game(index)
+        return finished_games
+
+    def __add_transition(self, index, player, allowed_actions, observation, done):
+        reward = float(self.accumulated_rewards[index, player])
+        self.episode_rewards[index, player] += reward
+        self.transitions[index].append(StateTransition(
+            self.previous_observations[index][player],
+            allowed_actions,
+            self.previous_actions[index][player],
+            reward,
+            observation,
+            done))
+
+    def __reset_game(self, index):
+        self.previous_observations[index] = [None, None]
+        self.previous_actions[index] = [None, None]
+        self.accumulated_rewards[index] = 0
+        self.episode_rewards[index] = 0
+        self.transitions[index] = []
+
+
+def run_actor(model, epsilon, parameters, nr_of_games, weights_queue, transition_queue, stop_event):
+    """
+    Play nr_of_games self-play games at a time with the latest model snapshot from the weights queue, starting at
+    the given epsilon, and put the state transitions of every finished game on the transition queue, together with
+    the epsilon of the next game and the rewards of both players. Runs in a separate process and does not need
+    TensorFlow.
+    """
+    actor = VectorActor(
+        model, epsilon, parameters.minimum_epsilon, parameters.epsilon_decay_factor_per_episode, nr_of_games)
+
+    while not stop_event.is_set():
+        try:
+            actor.model = weights_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+        for game in actor.step():
+            transition_queue.put(game)
+
+
+class ActorLearner:
+    """
+    Generates experience in a pool of actor processes and trains a DqnAgent (the learner) in this process. The
+    learner owns the replay buffer and the Keras model; every weights_update_frequency_steps transitions it sends
+    a NumpyModel snapshot of its weights to the actors. The actors start at the epsilon of the learner and report
+    their epsilon and episode rewards with every game, so the checkpoints of the learner carry the epsilon to resume
+    from and a score.
+
+    Every actor plays games_per_actor games in lockstep, so it chooses their actions with one batched forward pass.
+    The actors are started with the spawn method, so they do not inherit the TensorFlow state of the learner and
+    only import the modules they need.
+    """
+
+    def __init__(self, agent, parameters, nr_of_actors, weights_update_frequency_steps=1000, transition_queue_size=100,
+                 games_per_actor=16):
+        self.agent = agent
+        self.parameters = parameters
+        self.nr_of_actors = nr_of_actors
+        self.games_per_actor = games_per_actor
+        self.weights_update_frequency_steps = weights_update_frequency_steps
+        self.transition_queue_size = transition_queue_size
+
+    def run(self, nr_of_episodes):
+        context = multiprocessing.get_context("spawn")
+        transition_queue = context.Queue(maxsize=self.transition_queue_size)
+        weights_queues = [context.Queue(maxsize=1) for _ in range(self.nr_of_actors)]
+        stop_event = context.Event()
+
+        model = NumpyModel.from_keras_model(self.agent.model)
+        actors = [
+            context.Process(
+                target=run_actor,
+                args=(model, self.agent.current_epsilon, self.parameters, self.games_per_actor,
+                      weights_queues[index], transition_queue, stop_event),
+                daemon=True)
+            for index in range(self.nr_of_actors)]
+        for actor in actors:
+            actor.start()
+
+        try:
+            for episode in range(nr_of_episodes):
+                transitions, epsilon, episode_rewards = self.__next_game(transition_queue, actors)
+                self.agent.current_epsilon = epsilon
+                self.agent.checkpoint_episode_rewards.extend(episode_rewards)
+                for transition in transitions:
+                    self.agent.replay_buffer.add(transition)
+                    self.agent.step_count += 1
+                    self.agent.learn()
+
+                    if self.agent.step_count % self.weights_update_frequency_steps == 0:
+                        self.__publish_weights(weights_queues)
+
+                # The learner does not play, so the end of every game of the actors ends its episode
+                self.agent.train_at_episode_end()
+                if self.agent.logger is None:
+                    print(f"{self.agent.name} learned from game {episode}. "
+                          f"{self.agent.steps_per_second:.1f} steps/s, {self.agent.updates_per_second:.1f} updates/s.")
+        finally:
+            stop_event.set()
+            for actor in actors:
+                actor.terminate()
+                actor.join()
+            # Snapshots that were not picked up can not be flushed anymore, do not wait for them on exit
+            for weights_queue in weights_queues:
+                weights_queue.cancel_join_thread()
+
+    @staticmethod
+    def __next_game(transition_queue, actors):
+        """
+        Return the transitions, the epsilon and the episode rewards of the next game. Raises a RuntimeError when all
+        actors stopped, instead of waiting forever for a game that will not come.
+        """
+        while True:
+            try:
+                return transition_queue.get(timeout=TRANSITION_TIMEOUT)
+            except queue.Empty:
+                if not any(actor.is_alive() for actor in actors):
+                    exit_codes = [actor.exitcode for actor in actors]
+                    raise RuntimeError(f"All actors stopped (exit codes {exit_codes})")
+
+    def __publish_weights(self, weights_queues):
+        model = NumpyModel.from_keras_model(self.agent.model)
+        for weights_queue in weights_queues:
+            # Replace a snapshot the actor did not pick up yet
+            try:
+                weights_queue.get_nowait()
+            except queue.Empty:
+                pass
+            weights_queue.put(model)
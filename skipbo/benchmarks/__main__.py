@@ -0,0 +1,61 @@
+"""
+Run the benchmarks of the startup time, engine, environment, replay buffer, inference, training, MCTS against
+greedy play and the batched self-play actor, and write the results to a JSON file so runs can be compared across
+commits. Every benchmark is repeated and the median of each result is reported.
+
+Usage: python -m skipbo.benchmarks [--output benchmarks.json] [--repeats 3]
+                                   [startup engine replay inference training mcts vector]
+"""
+import argparse
+import importlib
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+import numpy as np
+
+BENCHMARKS = ["startup", "engine", "replay", "inference", "training", "mcts", "vector"]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(name, repeats):
+    module = importlib.import_module(f"skipbo.benchmarks.{name}")
+    runs = [module.run() for _ in range(repeats)]
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+
+parser = argparse.ArgumentParser(description="Skip-Bo throughput benchmarks")
+parser.add_argument("benchmarks", nargs="*", default=BENCHMARKS, help=f"any of {', '.join(BENCHMARKS)}")
+parser.add_argument("--output", default="benchmarks.json")
+parser.add_argument("--repeats", type=int, default=3)
+arguments = parser.parse_args()
+for benchmark in arguments.benchmarks:
+    if benchmark not in BENCHMARKS:
+        parser.error(f"unknown benchmark {benchmark}")
+
+results = {}
+for benchmark in arguments.benchmarks:
+    results[benchmark] = run_benchmark(benchmark, arguments.repeats)
+    for key, value in results[benchmark].items():
+        print(f"{benchmark}.{key}: {value:.1f}")
+
+report = {
+    "commit": git_commit(),
+    "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    "python": platform.python_version(),
+    "numpy": np.__version__,
+    "machine": platform.machine(),
+    "repeats": arguments.repeats,
+    "results": results
+}
+with open(arguments.output, "w") as file:
+    json.dump(report, file, indent=2)
+print(f"Results written to {arguments.output}")
@@ -0,0 +1,46 @@
+import random
+import time
+
+import numpy as np
+
+from skipbo.action_mask import ActionMask
+from skipbo.game.skipbo_game import SkipBoGame, actions_from_mask
+from skipbo.observation_encoder import OBSERVATION_SIZE, ObservationEncoder
+from skipbo.skipbo_env import SkipboEnv
+
+
+def play_random_moves(nr_of_moves, seed, observe):
+    """
+    Play random moves in seeded games (starting a new game when one is finished) and return the number of moves
+    per second. With observe every move is followed by the work SkipboEnv.play does: encoding the observation and
+    the action mask of the next player.
+    """
+    choices = random.Random(seed)
+    observation = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+    game = SkipBoGame(choices.getrandbits(64))
+
+    start = time.perf_counter()
+    for _ in range(nr_of_moves):
+        action = choices.choice(actions_from_mask(game.available_action_mask))
+        _, done = SkipboEnv.play_action(game, action)
+        if done:
+            game = SkipBoGame(choices.getrandbits(64))
+        if observe:
+            ObservationEncoder.encode(game, game.current_player, out=observation)
+            ActionMask.to_array(game.get_available_action_mask(game.current_player))
+    return nr_of_moves / (time.perf_counter() - start)
+
+
+def run(nr_of_moves=50000, seed=0):
+    """
+    Measure the raw game engine and the environment step (engine plus observation encoding) under random play.
+    """
+    return {
+        "game_moves_per_s": play_random_moves(nr_of_moves, seed, observe=False),
+        "env_steps_per_s": play_random_moves(nr_of_moves, seed, observe=True),
+    }
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name}: {value:.1f}")
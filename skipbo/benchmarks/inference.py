@@ -0,0 +1,39 @@
+import time
+
+import numpy as np
+
+from skipbo.model import ModelManager
+from skipbo.observation_encoder import OBSERVATION_SIZE
+from skipbo.q_functions import QFunctions
+
+
+def time_per_call(function, repetitions):
+    function()  # warm up, so tracing is not part of the measurement
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        function()
+    return (time.perf_counter() - start) / repetitions
+
+
+def run(repetitions=200, batch_size=256):
+    """
+    Compare the per call latency of model.predict with the compiled QFunctions path, for single rows and batches.
+    Returns the latencies in microseconds.
+    """
+    model = ModelManager.create_model(OBSERVATION_SIZE, 80, 0.001, 0.001)
+    random = np.random.default_rng(0)
+    state = random.random(OBSERVATION_SIZE, dtype=np.float32)
+    states = random.random((batch_size, OBSERVATION_SIZE), dtype=np.float32)
+
+    results = {
+        "predict_single_us": time_per_call(lambda: model.predict(state[np.newaxis, ...], verbose=0), repetitions),
+        "q_functions_single_us": time_per_call(lambda: QFunctions.get_q_values(model, state), repetitions),
+        "predict_batch_us": time_per_call(lambda: model.predict(states, verbose=0), repetitions),
+        "q_functions_batch_us": time_per_call(lambda: QFunctions.get_multiple_q_values(model, states), repetitions),
+    }
+    return {name: seconds * 1e6 for name, seconds in results.items()}
+
+
+if __name__ == "__main__":
+    for name, microseconds in run().items():
+        print(f"{name}: {microseconds:.1f}")
@@ -0,0 +1,97 @@
+"""
+Paired evaluation of MctsAgent against the greedy policy of the same model at a fixed search time per move.
+
+Usage: python -m skipbo.benchmarks.mcts [checkpoint.npz] [--pairs 50] [--time-budget 0.02]
+
+Without a checkpoint a random model is used, which only shows that the search works. With a checkpoint of a DQN that
+trained for 25 minutes MCTS loses clearly (mcts_score 0.08 over 100 pairs at 20 ms per move): the gaps between its
+Q-values are smaller than their errors and the maximum over explored moves overrates them.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from skipbo.mcts_agent import MctsAgent
+from skipbo.numpy_model import NumpyModel
+from skipbo.observation_encoder import OBSERVATION_SIZE
+from skipbo.skipbo_env import SkipboEnv
+from skipbo.tournament import GreedyAgent, Tournament, load_checkpoint
+
+
+class TimedMctsAgent(MctsAgent):
+    """
+    MctsAgent that measures the time it takes per move and does not print its rewards.
+    """
+
+    def __init__(self, name, model, time_budget, seed):
+        # The node budget is large enough that the time budget ends every search
+        super().__init__(name, model, node_budget=1000000, time_budget=time_budget, seed=seed)
+        self.nr_of_moves = 0
+        self.seconds = 0.0
+
+    def action(self, observation, allowed_actions, reward, extra):
+        start = time.perf_counter()
+        action = super().action(observation, allowed_actions, reward, extra)
+        self.seconds += time.perf_counter() - start
+        self.nr_of_moves += 1
+        return action
+
+    def done(self, final_observation, reward):
+        self.reset_after_episode()
+
+
+def random_model(seed, hidden_layer_sizes=(64,)):
+    """
+    Return a NumpyModel with random weights and relu hidden layers of the given sizes, without TensorFlow.
+    """
+    random = np.random.default_rng(seed)
+    sizes = [OBSERVATION_SIZE, *hidden_layer_sizes, 80]
+    return NumpyModel([random.normal(0, 0.05, (inputs, outputs)).astype(np.float32)
+                       for inputs, outputs in zip(sizes, sizes[1:])],
+                      [np.zeros(outputs, dtype=np.float32) for outputs in sizes[1:]],
+                      ["relu"] * len(hidden_layer_sizes) + ["linear"])
+
+
+def run(checkpoint=None, nr_of_pairs=20, time_budget=0.02, seed=0):
+    """
+    Play nr_of_pairs pairs of games (the same deal twice with the seats swapped, like the tournament) between MCTS
+    with time_budget seconds per move and the greedy action of the same model, a checkpoint or a random model.
+    Returns the score of MCTS (draws count half) with its 95% Wilson interval and the milliseconds per MCTS move.
+    """
+    model = load_checkpoint(checkpoint) if checkpoint is not None else random_model(seed)
+    mcts = TimedMctsAgent("mcts", model, time_budget, seed)
+    greedy = GreedyAgent("greedy", model)
+    environment = SkipboEnv()
+    results = [0, 0, 0]
+    for game_seed in range(seed, seed + nr_of_pairs):
+        for agents in ([mcts, greedy], [greedy, mcts]):
+            winner = environment.play(agents, {"episode": game_seed, "seed": game_seed, "verbose": False})
+            if winner is None:
+                results[2] += 1
+            elif agents[winner] is mcts:
+                results[0] += 1
+            else:
+                results[1] += 1
+
+    games = sum(results)
+    score = results[0] + 0.5 * results[2]
+    low, high = Tournament.wilson_interval(score, games)
+    return {
+        "mcts_score": score / games,
+        "mcts_score_low": low,
+        "mcts_score_high": high,
+        "mcts_ms_per_move": mcts.seconds / max(mcts.nr_of_moves, 1) * 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MCTS against greedy at a fixed time per move")
+    parser.add_argument("checkpoint", nargs="?", help="checkpoint of the model, a random model by default")
+    parser.add_argument("--pairs", type=int, default=50)
+    parser.add_argument("--time-budget", type=float, default=0.02, help="search time per move in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    for name, value in run(arguments.checkpoint, arguments.pairs, arguments.time_budget, arguments.seed).items():
+        print(f"{name}: {value:.3f}")
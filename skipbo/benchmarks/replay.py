@@ -0,0 +1,56 @@
+import time
+
+import numpy as np
+
+from skipbo.observation_encoder import OBSERVATION_SIZE
+from skipbo.replay_buffer import ReplayBuffer
+from skipbo.state_transition import StateTransition
+
+
+def create_transitions(nr_of_transitions, seed):
+    """
+    Return random state transitions with a fixed seed. They are reused while filling the buffer, so creating them is
+    not part of the measurement.
+    """
+    random = np.random.default_rng(seed)
+    transitions = []
+    for _ in range(nr_of_transitions):
+        allowed_actions = np.flatnonzero(random.random(80) < 0.2).tolist()
+        transitions.append(StateTransition(
+            random.random(OBSERVATION_SIZE, dtype=np.float32),
+            allowed_actions,
+            int(random.integers(80)),
+            float(random.normal()),
+            random.random(OBSERVATION_SIZE, dtype=np.float32),
+            bool(random.random() < 0.01)))
+    return transitions
+
+
+def run(size=250000, nr_of_adds=250000, batch_size=256, nr_of_batches=500, seed=0):
+    """
+    Measure the add rate of transitions and the sample rate of batches of a ReplayBuffer with the given capacity.
+    """
+    transitions = create_transitions(1000, seed)
+    replay_buffer = ReplayBuffer(size, OBSERVATION_SIZE)
+    replay_buffer.random = np.random.default_rng(seed)
+
+    start = time.perf_counter()
+    for index in range(nr_of_adds):
+        replay_buffer.add(transitions[index % len(transitions)])
+    add_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(nr_of_batches):
+        replay_buffer.get_batch(batch_size)
+    sample_seconds = time.perf_counter() - start
+
+    return {
+        "replay_adds_per_s": nr_of_adds / add_seconds,
+        "replay_batches_per_s": nr_of_batches / sample_seconds,
+        "replay_sampled_transitions_per_s": nr_of_batches * batch_size / sample_seconds,
+    }
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name}: {value:.1f}")
@@ -0,0 +1,51 @@
+import json
+import subprocess
+import sys
+
+# Modules that have to import without loading TensorFlow, which is only loaded when a Keras model is built or loaded
+MODULES = [
+    "skipbo.game.skipbo_game",
+    "skipbo.skipbo_env",
+    "skipbo.human_agent",
+    "skipbo.trained_dqn_agent",
+    "skipbo.mcts_agent",
+    "skipbo.dqn_agent",
+    "skipbo.model",
+    "skipbo.tournament",
+]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start, "tensorflow": "tensorflow" in sys.modules}}))
+"""
+
+
+def import_module(module):
+    """
+    Import a module in a new interpreter and return the import time in seconds and whether TensorFlow was loaded.
+    """
+    output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT.format(module=module)], capture_output=True,
+                            text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result["seconds"], result["tensorflow"]
+
+
+def run():
+    """
+    Measure the import time of the entry points in a fresh interpreter each. Raises a RuntimeError when one of them
+    loads TensorFlow.
+    """
+    results = {}
+    for module in MODULES:
+        seconds, tensorflow_loaded = import_module(module)
+        if tensorflow_loaded:
+            raise RuntimeError(f"Importing {module} loads TensorFlow")
+        results[f"{module}_import_ms"] = seconds * 1000
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name}: {value:.1f}")
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from skipbo.benchmarks.replay import create_transitions
+from skipbo.dqn_agent import DqnAgent
+from skipbo.dqn_agent_parameters import DqnAgentParameters
+from skipbo.metrics_logger import MetricsLogger
+from skipbo.model import ModelManager
+from skipbo.observation_encoder import OBSERVATION_SIZE
+from skipbo.replay_buffer import ReplayBuffer
+from skipbo.skipbo_env import SkipboEnv
+
+
+def train_steps_per_second(nr_of_steps, batch_size, seed):
+    """
+    Measure gradient steps per second as DqnAgent.train does them: sampling a batch from the replay buffer and
+    running the compiled Double DQN train step on it, with synthetic transitions.
+    """
+    import tensorflow as tf
+
+    tf.random.set_seed(seed)
+    model = ModelManager.create_model(OBSERVATION_SIZE, 80, 0.001, 0.001)
+    target_model = ModelManager.copy_model(model)
+    train_step = ModelManager.create_train_step(model, target_model, 0.995)
+
+    replay_buffer = ReplayBuffer(10000, OBSERVATION_SIZE)
+    replay_buffer.random = np.random.default_rng(seed)
+    for transition in create_transitions(2000, seed):
+        replay_buffer.add(transition)
+    weights = np.ones(batch_size, dtype=np.float32)
+
+    def step():
+        batch = replay_buffer.get_batch(batch_size)
+        train_step(batch.old_states, batch.actions, batch.rewards, batch.new_states, batch.dones,
+                   batch.allowed_action_masks, weights)
+
+    step()  # warm up, so tracing is not part of the measurement
+    start = time.perf_counter()
+    for _ in range(nr_of_steps):
+        step()
+    return nr_of_steps / (time.perf_counter() - start)
+
+
+def self_play_steps_per_second(nr_of_steps, batch_size, seed):
+    """
+    Measure end to end training: two DqnAgents with the parameters of main.py (but a smaller replay buffer) play
+    each other with SkipboEnv.play, which covers acting, replay adds, the training schedule, training and target
+    updates. Returns the environment steps and gradient steps per second after a warm up game that fills the
+    replay buffer up to training_start and traces the compiled functions.
+    """
+    import tensorflow as tf
+
+    tf.random.set_seed(seed)
+    np.random.seed(seed)
+    parameters = DqnAgentParameters({
+        "starting_epsilon": 1.0,
+        "epsilon_decay": 0.995,
+        "minimum_epsilon": 0.01,
+        "epsilon_decay_factor_per_episode": 0.995,
+        "replay_buffer_size": 20000,
+        "target_network_replace_frequency_steps": 1000,
+        "training_batch_size": batch_size,
+        "training_start": batch_size,
+        "discount_factor": 0.995,
+        "backup_frequency_steps": 10 ** 9
+    })
+
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        # The agents create their checkpoint directories under models/
+        os.chdir(directory)
+        try:
+            logger = MetricsLogger(os.path.join(directory, "metrics.csv"))
+            agents = [DqnAgent(name, ModelManager.create_model(OBSERVATION_SIZE, 80, 0.001, 0.001), parameters,
+                               logger=logger)
+                      for name in ["A", "B"]]
+            environment = SkipboEnv(logger=logger)
+
+            def steps():
+                return (sum(agent.step_count for agent in agents),
+                        sum(agent.training_scheduler.gradient_steps for agent in agents))
+
+            episode = 0
+            while min(agent.training_scheduler.gradient_steps for agent in agents) == 0:
+                environment.play(agents, {"episode": episode, "seed": seed + episode, "verbose": False})
+                episode += 1
+
+            start_steps, start_gradient_steps = steps()
+            start = time.perf_counter()
+            while steps()[0] - start_steps < nr_of_steps:
+                environment.play(agents, {"episode": episode, "seed": seed + episode, "verbose": False})
+                episode += 1
+            elapsed = time.perf_counter() - start
+            end_steps, end_gradient_steps = steps()
+
+            logger.close()
+            for agent in agents:
+                agent.checkpoint_manager.close()
+        finally:
+            os.chdir(working_directory)
+
+    return (end_steps - start_steps) / elapsed, (end_gradient_steps - start_gradient_steps) / elapsed
+
+
+def run(nr_of_steps=200, nr_of_self_play_steps=2000, batch_size=256, seed=0):
+    """
+    Measure the train step on its own and end to end training in self-play.
+    """
+    self_play_steps, self_play_updates = self_play_steps_per_second(nr_of_self_play_steps, batch_size, seed)
+    return {
+        "train_steps_per_s": train_steps_per_second(nr_of_steps, batch_size, seed),
+        "self_play_steps_per_s": self_play_steps,
+        "self_play_updates_per_s": self_play_updates,
+    }
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name}: {value:.1f}")
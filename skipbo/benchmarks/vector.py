@@ -0,0 +1,35 @@
+import time
+
+from skipbo.actor_learner import VectorActor
+from skipbo.benchmarks.mcts import random_model
+
+# The layers of ModelManager.create_model
+HIDDEN_LAYER_SIZES = (256, 128, 128)
+
+
+def actor_steps_per_second(nr_of_games, nr_of_steps, seed):
+    """
+    Return the environment steps per second of a VectorActor with nr_of_games games in lockstep, over about
+    nr_of_steps steps in total.
+    """
+    # A constant epsilon of 0.1
+    actor = VectorActor(random_model(seed, HIDDEN_LAYER_SIZES), 0.1, 0.1, 1.0, nr_of_games, seed)
+    nr_of_rounds = max(nr_of_steps // nr_of_games, 1)
+    start = time.perf_counter()
+    for _ in range(nr_of_rounds):
+        actor.step()
+    return nr_of_rounds * nr_of_games / (time.perf_counter() - start)
+
+
+def run(nr_of_steps=20000, seed=0):
+    """
+    Measure how the throughput of an actor scales with the number of games it plays in lockstep, where all games
+    share one batched forward pass of the model (a NumpyModel with the layers of ModelManager.create_model).
+    """
+    return {f"actor_{nr_of_games}_games_steps_per_s": actor_steps_per_second(nr_of_games, nr_of_steps, seed)
+            for nr_of_games in (1, 4, 16, 64)}
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name}: {value:.1f}")
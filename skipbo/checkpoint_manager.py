@@ -0,0 +1,164 @@
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+from skipbo.numpy_model import NumpyModel
+
+INDEX_FILE = "checkpoints.json"
+
+
+class CheckpointManager:
+    """
+    Writes checkpoints of an agent to a directory on a background thread. save only takes an in memory snapshot,
+    so training continues while the file is written. Files are written under a temporary name and renamed, so a
+    checkpoint is either complete or not there at all.
+
+    A checkpoint is a .npz file with the kernels, biases and activations in the format of NumpyModel (so
+    NumpyModel.load and the tournament can read it), the optimizer variables, the step count, epsilon and an optional
+    score, the target network and the counters of the training state. After every write only the keep_last most recent checkpoints and the keep_best checkpoints with the
+    highest score are kept. The checkpoints and their scores are listed in checkpoints.json.
+    """
+
+    def __init__(self, directory, keep_last=5, keep_best=1):
+        self.directory = directory
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        os.makedirs(directory, exist_ok=True)
+        self.checkpoints = self.__load_index()
+        # An error of the background thread, raised by the next call to save or flush
+        self.error = None
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.__write_checkpoints, daemon=True)
+        self.thread.start()
+
+    def save(self, step, model, optimizer_state, epsilon, score=None, target_model=None, training_state=None):
+        """
+        Queue a checkpoint of a NumpyModel snapshot of the weights (see NumpyModel.from_keras_model) and the
+        optimizer state, with an optional snapshot of the target network and a dict of numbers like the counters of
+        the TrainingScheduler. The arrays must not be changed afterwards.
+        """
+        self.__raise_error()
+        self.queue.put((step, model, optimizer_state, epsilon, score, target_model, training_state))
+
+    def flush(self):
+        """
+        Wait until all queued checkpoints are written.
+        """
+        self.queue.join()
+        self.__raise_error()
+
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+
+    def latest(self):
+        """
+        Return the file of the most recent checkpoint, or None when there is none.
+        """
+        if not self.checkpoints:
+            return None
+        return os.path.join(self.directory, max(self.checkpoints, key=lambda checkpoint: checkpoint["step"])["file"])
+
+    @staticmethod
+    def load(file):
+        """
+        Return a checkpoint as a dict with the model (a NumpyModel), optimizer_state, step, epsilon, score,
+        target_model (a NumpyModel, or None when it was not saved) and training_state.
+        """
+        model = NumpyModel.load(file)
+        with np.load(file) as data:
+            nr_of_optimizer_variables = int(data["nr_of_optimizer_variables"])
+            checkpoint = {
+                "model": model,
+                "optimizer_state": [data[f"optimizer_{index}"] for index in range(nr_of_optimizer_variables)],
+                "step": int(data["step"]),
+                "epsilon": float(data["epsilon"]),
+                "score": float(data["score"]) if not np.isnan(data["score"]) else None,
+                "target_model": None,
+                "training_state": {key[len("training_"):]: data[key].item()
+                                   for key in data.files if key.startswith("training_")}
+            }
+            if "target_kernel_0" in data.files:
+                nr_of_layers = len(model.activations)
+                checkpoint["target_model"] = NumpyModel(
+                    [data[f"target_kernel_{index}"] for index in range(nr_of_layers)],
+                    [data[f"target_bias_{index}"] for index in range(nr_of_layers)],
+                    model.activations)
+        return checkpoint
+
+    def __write_checkpoints(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self.__write_checkpoint(*item)
+            except Exception as exception:
+                self.error = exception
+            finally:
+                self.queue.task_done()
+
+    def __raise_error(self):
+        if self.error is not None:
+            error = self.error
+            self.error = None
+            raise error
+
+    def __write_checkpoint(self, step, model, optimizer_state, epsilon, score, target_model, training_state):
+        arrays = {
+            "activations": np.array(model.activations),
+            "nr_of_optimizer_variables": np.array(len(optimizer_state)),
+            "step": np.array(step),
+            "epsilon": np.array(epsilon),
+            "score": np.array(np.nan if score is None else score)
+        }
+        for index, (kernel, bias) in enumerate(zip(model.kernels, model.biases)):
+            arrays[f"kernel_{index}"] = kernel
+            arrays[f"bias_{index}"] = bias
+        for index, value in enumerate(optimizer_state):
+            arrays[f"optimizer_{index}"] = value
+        if target_model is not None:
+            for index, (kernel, bias) in enumerate(zip(target_model.kernels, target_model.biases)):
+                arrays[f"target_kernel_{index}"] = kernel
+                arrays[f"target_bias_{index}"] = bias
+        for key, value in (training_state or {}).items():
+            arrays[f"training_{key}"] = np.array(value)
+
+        file = f"{step}.npz"
+        self.__write_atomically(file, lambda output: np.savez(output, **arrays))
+
+        self.checkpoints = [checkpoint for checkpoint in self.checkpoints if checkpoint["file"] != file]
+        self.checkpoints.append({"file": file, "step": step, "score": score})
+        self.__apply_retention()
+        self.__write_atomically(INDEX_FILE, lambda output: output.write(json.dumps(self.checkpoints).encode()))
+
+    def __apply_retention(self):
+        by_step = sorted(self.checkpoints, key=lambda checkpoint: checkpoint["step"], reverse=True)
+        scored = [checkpoint for checkpoint in self.checkpoints if checkpoint["score"] is not None]
+        by_score = sorted(scored, key=lambda checkpoint: checkpoint["score"], reverse=True)
+        keep = by_step[:self.keep_last] + by_score[:self.keep_best]
+
+        for checkpoint in self.checkpoints:
+            if checkpoint not in keep:
+                path = os.path.join(self.directory, checkpoint["file"])
+                if os.path.exists(path):
+                    os.remove(path)
+        self.checkpoints = [checkpoint for checkpoint in by_step if checkpoint in keep]
+
+    def __write_atomically(self, file, write):
+        path = os.path.join(self.directory, file)
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as output:
+            write(output)
+        os.replace(temporary_path, path)
+
+    def __load_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path) as file:
+            return json.load(file)
@@ -0,0 +1,85 @@
+"""
+Export recorded games to a dataset of state transitions for offline training.
+
+Usage: python -m skipbo.dataset_export games.skbr datasets/games
+"""
+import sys
+
+from skipbo.agent import Agent
+from skipbo.game_record import GameRecords
+from skipbo.memmap_replay_buffer import MemmapReplayBuffer
+from skipbo.observation_encoder import OBSERVATION_SIZE
+from skipbo.skipbo_env import SkipboEnv
+from skipbo.state_transition import StateTransition
+
+
+class RecordedGameAgent(Agent):
+    """
+    Agent that plays the actions of a recorded game and collects its state transitions the way DqnAgent does: the
+    reward of a transition is the reward collected until the next turn of the agent.
+    """
+
+    def __init__(self, name, transitions):
+        super().__init__()
+        self.name = name
+        self.actions = None
+        self.transitions = transitions
+        self.previous_observation = None
+        self.previous_action = None
+
+    def action(self, observation, allowed_actions, reward, extra):
+        if self.previous_observation is not None:
+            self.transitions.append(StateTransition(
+                self.previous_observation,
+                allowed_actions,
+                self.previous_action,
+                reward,
+                observation,
+                False))
+
+        action = next(self.actions)
+        self.previous_observation = observation
+        self.previous_action = action
+        return action
+
+    def done(self, final_observation, reward):
+        self.transitions.append(StateTransition(
+            self.previous_observation,
+            [],
+            self.previous_action,
+            reward,
+            self.previous_observation,
+            True))
+        self.previous_observation = None
+        self.previous_action = None
+
+
+def export_dataset(record_file, directory):
+    """
+    Replay all games of a record file and write the state transitions of both players to a MemmapReplayBuffer in
+    the directory (see MemmapReplayBuffer.open). Returns the number of games and transitions.
+    """
+    nr_of_games, nr_of_moves = GameRecords.count_moves(record_file)
+    replay_buffer = MemmapReplayBuffer(directory, nr_of_moves, OBSERVATION_SIZE)
+
+    transitions = []
+    agents = [RecordedGameAgent("Player 1", transitions), RecordedGameAgent("Player 2", transitions)]
+    environment = SkipboEnv()
+    for episode, (seed, actions) in enumerate(GameRecords.read(record_file)):
+        # Both seats take their actions from the same sequence
+        iterator = iter(actions)
+        for agent in agents:
+            agent.actions = iterator
+        environment.play(agents, {"episode": episode, "seed": seed, "verbose": False})
+
+        for transition in transitions:
+            replay_buffer.add(transition)
+        transitions.clear()
+
+    replay_buffer.flush()
+    return nr_of_games, nr_of_moves
+
+
+if __name__ == "__main__":
+    games, moves = export_dataset(sys.argv[1], sys.argv[2])
+    print(f"Exported {moves} transitions of {games} games to {sys.argv[2]}")
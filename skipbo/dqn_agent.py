@@ -1,20 +1,35 @@
 import os
 
 import numpy as np
-from tensorflow.python.keras import Sequential
 
+from skipbo.action_mask import ActionMask
 from skipbo.agent import Agent
+from skipbo.checkpoint_manager import CheckpointManager
 from skipbo.dqn_agent_parameters import DqnAgentParameters
+from skipbo.memmap_replay_buffer import MemmapReplayBuffer
+from skipbo.metrics_logger import MetricsLogger
 from skipbo.model import ModelManager
+from skipbo.numpy_model import NumpyModel
+from skipbo.prioritized_replay_buffer import PrioritizedReplayBuffer
+from skipbo.profiler import Profiler
 from skipbo.q_functions import QFunctions
 from skipbo.replay_buffer import ReplayBuffer
 from skipbo.state_transition import StateTransition
+from skipbo.training_scheduler import TrainingScheduler
 
 
 class DqnAgent(Agent):
 
-    def __init__(self, name: str, model: Sequential, parameters: DqnAgentParameters):
+    def __init__(self, name: str, model, parameters: DqnAgentParameters, profiler: Profiler = None,
+                 logger: MetricsLogger = None):
+        """
+        The optional profiler times prediction, replay, training, target updates and backups, pass the profiler of
+        the environment to get all phases in one summary. When the environment logs the games to a MetricsLogger,
+        pass it here as well so the agent does not print its reward after every game.
+        """
         super().__init__()
+        self.profiler = Profiler() if profiler is None else profiler
+        self.logger = logger
         self.name = name
         self.model = model
         self.target_model = ModelManager.copy_model(model)
@@ -23,6 +38,12 @@ class DqnAgent(Agent):
         self.minimum_epsilon = parameters.minimum_epsilon
         self.epsilon_decay_factor_per_episode = parameters.epsilon_decay_factor_per_episode
         self.target_network_replace_frequency_steps = parameters.target_network_replace_frequency_steps
+        self.target_network_update_tau = parameters.target_network_update_tau
+        self.update_target_model = ModelManager.create_target_model_update(
+            model,
+            self.target_model,
+            1.0 if self.target_network_update_tau is None else self.target_network_update_tau)
+        self.train_step = ModelManager.create_train_step(model, self.target_model, parameters.discount_factor)
         self.training_start = parameters.training_start
         self.training_batch_size = parameters.training_batch_size
         self.discount_factor = parameters.discount_factor
@@ -30,9 +51,66 @@ class DqnAgent(Agent):
         self.previous_observation = None
         self.previous_action = None
         self.previous_allowed_actions = None
-        self.replay_buffer = ReplayBuffer(parameters.replay_buffer_size)
+        if parameters.prioritized_replay and parameters.persistent_replay_buffer:
+            raise ValueError("A persistent replay buffer can not be combined with prioritized replay")
+        elif parameters.prioritized_replay:
+            self.replay_buffer = PrioritizedReplayBuffer(
+                parameters.replay_buffer_size,
+                model.input_shape[-1],
+                parameters.priority_alpha,
+                parameters.priority_beta,
+                parameters.priority_beta_increment,
+                parameters.priority_epsilon)
+        elif parameters.persistent_replay_buffer:
+            self.replay_buffer = MemmapReplayBuffer(
+                os.path.join("models", name, "replay_buffer"),
+                parameters.replay_buffer_size,
+                model.input_shape[-1])
+        else:
+            self.replay_buffer = ReplayBuffer(parameters.replay_buffer_size, model.input_shape[-1])
+        self.training_scheduler = TrainingScheduler(
+            parameters.training_batch_size,
+            parameters.train_every_x_steps,
+            parameters.gradient_steps_per_update,
+            parameters.replay_ratio,
+            parameters.train_at_episode_end)
+        # Throughput of the last episode, as reported by the training scheduler in train_at_episode_end
+        self.steps_per_second = None
+        self.updates_per_second = None
         self.step_count = 0
         self.episode_reward = 0
+        # Rewards of the episodes since the last checkpoint, their mean is the score of the checkpoint
+        self.checkpoint_episode_rewards = []
+        self.checkpoint_manager = CheckpointManager(
+            os.path.join("models", name),
+            parameters.keep_last_checkpoints,
+            parameters.keep_best_checkpoints)
+        if parameters.resume_from_checkpoint:
+            self.resume()
+
+    def resume(self):
+        """
+        Continue from the latest checkpoint, if there is one: restore the weights of the model and target model, the
+        optimizer state, epsilon, the step count, the training schedule and the beta of prioritized replay. The
+        transitions in the replay buffer are only kept by a persistent replay buffer.
+        """
+        checkpoint_file = self.checkpoint_manager.latest()
+        if checkpoint_file is None:
+            return
+        checkpoint = CheckpointManager.load(checkpoint_file)
+        self.model.set_weights(checkpoint["model"].get_weights())
+        # Checkpoints written before the target network was saved start from a copy of the model
+        target_model = checkpoint["target_model"] or checkpoint["model"]
+        self.target_model.set_weights(target_model.get_weights())
+        ModelManager.set_optimizer_state(self.model, checkpoint["optimizer_state"])
+        self.current_epsilon = checkpoint["epsilon"]
+        self.step_count = checkpoint["step"]
+        training_state = checkpoint["training_state"]
+        if "gradient_steps" in training_state:
+            self.training_scheduler.set_state(training_state)
+        if "priority_beta" in training_state and isinstance(self.replay_buffer, PrioritizedReplayBuffer):
+            self.replay_buffer.beta = training_state["priority_beta"]
+        print(f"{self.name} resumed from {checkpoint_file}")
 
     def action(self, observation, allowed_actions, reward, extra):
         if self.previous_observation is not None:
@@ -41,8 +119,9 @@ class DqnAgent(Agent):
                 self.episode_reward += reward
             self.process_state_transition(observation, allowed_actions, reward, False)
 
-        q_values = QFunctions.get_q_values(self.model, observation)
-        action = QFunctions.select_action_epsilon_greedy(q_values, self.current_epsilon, allowed_actions)
+        action_mask = ActionMask.from_agent_arguments(allowed_actions, extra)
+        with self.profiler.phase("predict"):
+            action = QFunctions.get_action_epsilon_greedy(self.model, observation, self.current_epsilon, action_mask)
         self.previous_observation = observation
         self.previous_action = action
         self.previous_allowed_actions = allowed_actions
@@ -53,12 +132,25 @@ class DqnAgent(Agent):
         if reward != 0:
             self.episode_reward += reward
             # print(f"{self.name} got a reward of {reward}.")
-        print(f"{self.name} got a total reward of {self.episode_reward}.")
         self.process_state_transition(self.previous_observation, [], reward, True)
+        self.train_at_episode_end()
+        self.checkpoint_episode_rewards.append(self.episode_reward)
+        if self.logger is None:
+            print(f"{self.name} got a total reward of {self.episode_reward}. "
+                  f"{self.steps_per_second:.1f} steps/s, {self.updates_per_second:.1f} updates/s.")
         self.current_epsilon *= self.epsilon_decay_factor_per_episode
         self.current_epsilon = max(self.minimum_epsilon, self.current_epsilon)
         self.reset_after_episode()
 
+    def train_at_episode_end(self):
+        """
+        Take the gradient steps the schedule deferred to the end of the episode and report the throughput of the
+        episode. Called by done, and by ActorLearner after the transitions of every game of the actors.
+        """
+        for _ in range(self.training_scheduler.episode_end()):
+            self.train()
+        self.steps_per_second, self.updates_per_second = self.training_scheduler.report()
+
     def reset_after_episode(self):
         self.previous_observation = None
         self.previous_action = None
@@ -73,46 +165,67 @@ class DqnAgent(Agent):
             reward,
             observation,
             done)
-        self.replay_buffer.add(state_transition)
-
-        if self.step_count % self.target_network_replace_frequency_steps == 0:
+        with self.profiler.phase("replay_add"):
+            self.replay_buffer.add(state_transition)
+        self.learn()
+
+    def learn(self):
+        """
+        Update the target network, back up the model and train on batches from the replay buffer, depending on the
+        current step count and the training schedule.
+        """
+        if self.target_network_update_tau is not None:
+            with self.profiler.phase("target_update"):
+                self.update_target_model()
+        elif self.step_count % self.target_network_replace_frequency_steps == 0:
             print(self.name, "Updating target model")
-            self.target_model = ModelManager.copy_model(self.model)
+            with self.profiler.phase("target_update"):
+                self.update_target_model()
 
         if self.step_count != 0 and self.step_count % self.backup_frequency_steps == 0:
-            backup_file = f"models/{self.name}/{self.step_count}.h5"
-            print(f"Backing up model to {backup_file}")
-            self.model.save(backup_file)
-
-        if self.replay_buffer.length() >= self.training_start:
+            with self.profiler.phase("backup"):
+                self.save_checkpoint()
+                self.replay_buffer.flush()
+
+        can_train = self.replay_buffer.length() >= self.training_start
+        for _ in range(self.training_scheduler.environment_step(can_train)):
+            self.train()
+
+    def save_checkpoint(self):
+        """
+        Take a snapshot of the weights of the model and target model, the optimizer state, epsilon, the step count and
+        the training state, which the checkpoint manager writes to models/<name>/<step>.npz in the background.
+        """
+        score = None
+        if self.checkpoint_episode_rewards:
+            score = float(np.mean(self.checkpoint_episode_rewards))
+        training_state = self.training_scheduler.get_state()
+        if isinstance(self.replay_buffer, PrioritizedReplayBuffer):
+            training_state["priority_beta"] = self.replay_buffer.beta
+        self.checkpoint_manager.save(
+            self.step_count,
+            NumpyModel.from_keras_model(self.model),
+            ModelManager.get_optimizer_state(self.model),
+            self.current_epsilon,
+            score,
+            NumpyModel.from_keras_model(self.target_model),
+            training_state)
+        self.checkpoint_episode_rewards = []
+
+    def train(self):
+        with self.profiler.phase("replay_sample"):
             batch = self.replay_buffer.get_batch(batch_size=self.training_batch_size)
-            targets = self.calculate_target_values(batch)
-            states = np.array([state_transition.old_state for state_transition in batch])
-            self.model.fit(states, targets, epochs=1, batch_size=len(targets), verbose=0)
-
-    def calculate_target_values(self, state_transitions):
-        states = []
-        new_states = []
-        for transition in state_transitions:
-            states.append(transition.old_state)
-            new_states.append(transition.new_state)
-
-        new_states = np.array(new_states)
-
-        q_values_new_state = QFunctions.get_multiple_q_values(self.model, new_states)
-        q_values_new_state_target_model = QFunctions.get_multiple_q_values(self.target_model, new_states)
-
-        targets = []
-        for index, state_transition in enumerate(state_transitions):
-            if state_transition.done:
-                target_value = state_transition.reward
-            else:
-                best_action = QFunctions.select_best_action(q_values_new_state[index], state_transition.allowed_actions)
-                best_action_next_state_q_value = q_values_new_state_target_model[index][best_action]
-                target_value = state_transition.reward + self.discount_factor * best_action_next_state_q_value
-
-            target_vector = [0] * 80    # TODO replace by non-hardcoded
-            target_vector[state_transition.action] = target_value
-            targets.append(target_vector)
-
-        return np.array(targets)
+        weights = batch.weights if batch.weights is not None else np.ones(batch.length(), dtype=np.float32)
+        with self.profiler.phase("train_step"):
+            td_errors = self.train_step(
+                batch.old_states,
+                batch.actions,
+                batch.rewards,
+                batch.new_states,
+                batch.dones,
+                batch.allowed_action_masks,
+                weights)
+
+        if isinstance(self.replay_buffer, PrioritizedReplayBuffer):
+            with self.profiler.phase("update_priorities"):
+                self.replay_buffer.update_priorities(batch.indices, td_errors.numpy())
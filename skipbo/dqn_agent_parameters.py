@@ -11,3 +11,29 @@ class DqnAgentParameters:
         self.training_start = dictionary["training_start"]
         self.discount_factor = dictionary["discount_factor"]
         self.backup_frequency_steps = dictionary["backup_frequency_steps"]
+
+        # When set, the target network is blended towards the model after every step instead of being replaced
+        # every target_network_replace_frequency_steps
+        self.target_network_update_tau = dictionary.get("target_network_update_tau", None)
+
+        # Optional prioritized experience replay
+        self.prioritized_replay = dictionary.get("prioritized_replay", False)
+        self.priority_alpha = dictionary.get("priority_alpha", 0.6)
+        self.priority_beta = dictionary.get("priority_beta", 0.4)
+        self.priority_beta_increment = dictionary.get("priority_beta_increment", 0.00001)
+        self.priority_epsilon = dictionary.get("priority_epsilon", 0.01)
+
+        # Optional replay buffer stored in memory mapped files under models/<agent name>/replay_buffer
+        self.persistent_replay_buffer = dictionary.get("persistent_replay_buffer", False)
+
+        # Optional training schedule, by default the agent trains on one batch after every step
+        self.train_every_x_steps = dictionary.get("train_every_x_steps", 1)
+        self.gradient_steps_per_update = dictionary.get("gradient_steps_per_update", 1)
+        self.replay_ratio = dictionary.get("replay_ratio", None)
+        self.train_at_episode_end = dictionary.get("train_at_episode_end", False)
+
+        # Checkpoints in models/<agent name>: the number of most recent and best scoring ones to keep, and whether to
+        # continue from the latest checkpoint
+        self.keep_last_checkpoints = dictionary.get("keep_last_checkpoints", 5)
+        self.keep_best_checkpoints = dictionary.get("keep_best_checkpoints", 1)
+        self.resume_from_checkpoint = dictionary.get("resume_from_checkpoint", False)
@@ -0,0 +1,17 @@
+"""
+Export the weights of a trained Keras model to a .npz file that can be loaded with NumpyModel.load.
+
+Usage: python -m skipbo.export_model models/Emily/56000.h5 [models/Emily/56000.npz]
+"""
+import sys
+
+from tensorflow.keras.models import load_model
+
+from skipbo.model import ModelManager
+
+model_file = sys.argv[1]
+export_file = sys.argv[2] if len(sys.argv) > 2 else model_file.rsplit(".", 1)[0] + ".npz"
+
+model = load_model(model_file, compile=False)
+ModelManager.export_weights(model, export_file)
+print(f"Exported {model_file} to {export_file}")
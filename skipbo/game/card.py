@@ -1,3 +1,8 @@
+# Compact card codes used by SkipBoGame, matching Card.card_type
+SKIPBO_CARD = 0
+NO_CARD = -1
+
+
 class Card:
     def __init__(self, card_type):
         """
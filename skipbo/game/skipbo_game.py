@@ -1,15 +1,40 @@
 import random
+from array import array
 
-from skipbo.game.card import Card
+from skipbo.game.card import NO_CARD, SKIPBO_CARD
 
+NR_OF_CARDS = 162
+SKIPBO_STACK_SIZE = 30
+HAND_SIZE = 5
+CENTER_STACK_SIZE = 12
+NR_OF_ACTIONS = 80
 
-def validate_stack(stack):
-    count = 1
-    for card in reversed(stack):
-        if card.actual_value != count:
-            return False
-        count += 1
-    return True
+# Hand cards can be played to any of the player stacks (play to 4-7)
+PLAYER_STACK_TARGETS = 0b11110000
+
+
+def empty_stack(size):
+    return array('b', bytes(size))
+
+
+# Actions of every 8 bit row of the action mask, indexed by play from and the bits of the row
+ROW_ACTIONS = [[[8 * play_from + play_to for play_to in range(8) if row >> play_to & 1] for row in range(256)]
+               for play_from in range(10)]
+
+
+def actions_from_mask(mask):
+    """
+    Return the action indices (8 * play_from + play_to) of the bits that are set in an action mask.
+    """
+    actions = []
+    play_from = 0
+    while mask:
+        row = mask & 0xFF
+        if row:
+            actions += ROW_ACTIONS[play_from][row]
+        mask >>= 8
+        play_from += 1
+    return actions
 
 
 class SkipBoGame:
@@ -21,164 +46,238 @@ class SkipBoGame:
     Play to:
       0-3 = Center stacks
       4-7 = Player stacks
+
+    Cards are stored as small integer codes (see Card: 0 is a skipbo card, 1-12 are the value cards and -1 is an
+    empty hand position) in preallocated arrays. The top of a stack is the last used element of its array and the
+    number of used elements is kept in a separate length counter, so taking or putting a card never moves the
+    other cards of the stack.
+
+    A center stack always holds the values 1 up to its length, so the value of its top card (also when it is a
+    skipbo card) equals the length of the stack.
+
+    The legal actions of the current player are kept up to date as an 80 bit action mask, where bit
+    8 * play_from + play_to is set when the action is playable. Only the positions that change when a card is taken,
+    put or drawn are evaluated again; the complete mask is only rebuilt when the turn switches.
+
+    Every game has its own random number generator, so a game created with a seed deals and reshuffles the same
+    cards every time the same actions are played.
     """
 
-    def __init__(self):
-        self.cards = []
-        self.discarded = []
-        self.player_skipbo_stacks = [[], []]
-        self.player_hands = [[], []]
-        self.player_stacks = [[[], [], [], []], [[], [], [], []]]
-        self.center_stacks = [[], [], [], []]
+    def __init__(self, seed=None):
+        self.random = random.Random(seed)
+        self.cards = empty_stack(NR_OF_CARDS)
+        self.nr_of_cards = 0
+        self.discarded = empty_stack(NR_OF_CARDS)
+        self.nr_of_discarded = 0
+        self.player_skipbo_stacks = [empty_stack(SKIPBO_STACK_SIZE), empty_stack(SKIPBO_STACK_SIZE)]
+        self.skipbo_stack_lengths = [0, 0]
+        self.player_hands = [array('b', [NO_CARD] * HAND_SIZE), array('b', [NO_CARD] * HAND_SIZE)]
+        self.player_stacks = [[empty_stack(NR_OF_CARDS) for _ in range(4)] for _ in range(2)]
+        self.player_stack_lengths = [[0, 0, 0, 0], [0, 0, 0, 0]]
+        self.center_stacks = [empty_stack(CENTER_STACK_SIZE) for _ in range(4)]
+        self.center_stack_lengths = [0, 0, 0, 0]
+        # Center stacks (as a 4 bit mask) that accept a card, indexed by card code
+        self.center_targets = [0b1111, 0b1111] + [0] * 11
+        self.available_action_mask = 0
         self.current_player = 0
         self.done = False
 
         # 0 is the skipbo card
-        self.cards.extend([Card(0) for _ in range(18)])
+        cards = [SKIPBO_CARD] * 18
 
         for i in range(1, 13):
-            self.cards.extend([Card(i) for _ in range(12)])
+            cards.extend([i] * 12)
+
+        self.cards[:] = array('b', cards)
+        self.nr_of_cards = NR_OF_CARDS
 
         self.shuffle()
 
         for i in range(2):
-            skipbo_stack = self.draw_cards(30)
-            hand_cards = self.draw_cards(5)
-            self.player_skipbo_stacks[i].extend(skipbo_stack)
-            self.player_hands[i].extend(hand_cards)
+            skipbo_stack = self.draw_cards(SKIPBO_STACK_SIZE)
+            hand_cards = self.draw_cards(HAND_SIZE)
+            self.player_skipbo_stacks[i][:] = array('b', skipbo_stack)
+            self.skipbo_stack_lengths[i] = SKIPBO_STACK_SIZE
+            self.player_hands[i][:] = array('b', hand_cards)
+
+        self.__rebuild_action_mask()
 
     def draw_cards(self, nr):
-        to_draw = min(nr, len(self.cards))
-        drawn = self.cards[:nr]
-        self.cards = self.cards[nr:]
+        drawn = self.__pop_cards(nr)
 
-        if len(self.cards) == 0:
+        if self.nr_of_cards == 0:
             self.move_discarded_to_cards()
             remaining = nr - len(drawn)
-            drawn.extend(self.cards[:remaining])
-            self.cards = self.cards[remaining:]
+            drawn.extend(self.__pop_cards(remaining))
 
         return drawn
 
+    def __pop_cards(self, nr):
+        start = max(self.nr_of_cards - nr, 0)
+        drawn = self.cards[start:self.nr_of_cards].tolist()
+        self.nr_of_cards = start
+        return drawn
+
     def move_discarded_to_cards(self):
-        self.cards.extend(self.discarded)
+        end = self.nr_of_cards + self.nr_of_discarded
+        self.cards[self.nr_of_cards:end] = self.discarded[:self.nr_of_discarded]
+        self.nr_of_cards = end
         self.shuffle()
-        self.discarded = []
+        self.nr_of_discarded = 0
 
     def shuffle(self):
-        random.shuffle(self.cards)
+        cards = self.cards[:self.nr_of_cards].tolist()
+        self.random.shuffle(cards)
+        self.cards[:self.nr_of_cards] = array('b', cards)
+
+    def snapshot(self):
+        """
+        Return a copy of the complete game state, including the state of the random number generator, that can be
+        passed to restore. Only the card arrays and counters are copied, so the cost does not depend on the number
+        of moves played.
+        """
+        return (
+            self.cards[:],
+            self.nr_of_cards,
+            self.discarded[:],
+            self.nr_of_discarded,
+            [stack[:] for stack in self.player_skipbo_stacks],
+            self.skipbo_stack_lengths[:],
+            [hand[:] for hand in self.player_hands],
+            [[stack[:] for stack in stacks] for stacks in self.player_stacks],
+            [lengths[:] for lengths in self.player_stack_lengths],
+            [stack[:] for stack in self.center_stacks],
+            self.center_stack_lengths[:],
+            self.center_targets[:],
+            self.available_action_mask,
+            self.current_player,
+            self.done,
+            self.random.getstate())
+
+    def restore(self, snapshot):
+        """
+        Return the game to the state of a snapshot. The snapshot itself is not modified and can be restored again.
+        """
+        (cards, self.nr_of_cards, discarded, self.nr_of_discarded, player_skipbo_stacks, skipbo_stack_lengths,
+         player_hands, player_stacks, player_stack_lengths, center_stacks, center_stack_lengths, center_targets,
+         self.available_action_mask, self.current_player, self.done, random_state) = snapshot
+
+        self.cards = cards[:]
+        self.discarded = discarded[:]
+        self.player_skipbo_stacks = [stack[:] for stack in player_skipbo_stacks]
+        self.skipbo_stack_lengths = skipbo_stack_lengths[:]
+        self.player_hands = [hand[:] for hand in player_hands]
+        self.player_stacks = [[stack[:] for stack in stacks] for stacks in player_stacks]
+        self.player_stack_lengths = [lengths[:] for lengths in player_stack_lengths]
+        self.center_stacks = [stack[:] for stack in center_stacks]
+        self.center_stack_lengths = center_stack_lengths[:]
+        self.center_targets = center_targets[:]
+        self.random.setstate(random_state)
+
+    def copy(self):
+        """
+        Return an independent copy of the game, for example to explore moves without changing this game.
+        """
+        game = SkipBoGame.__new__(SkipBoGame)
+        game.random = random.Random()
+        game.restore(self.snapshot())
+        return game
+
+    def determinize(self, player, rng):
+        """
+        Shuffle the cards the given player cannot see (the draw pile, the hand of the opponent and the Skip-Bo stacks
+        of both players below their top cards) with the random number generator rng and reseed the game from it. On a
+        copy this gives a game that agrees with everything the player knows, without the real order of the cards.
+        """
+        other_player = 0 if player == 1 else 1
+        hand = self.player_hands[other_player]
+        # The Skip-Bo stacks lie face down, only their top cards are visible
+        hidden_skipbo_cards = [max(length - 1, 0) for length in self.skipbo_stack_lengths]
+
+        hidden = self.cards[:self.nr_of_cards].tolist()
+        hidden.extend(card for card in hand if card != NO_CARD)
+        for stack, nr_of_hidden_cards in zip(self.player_skipbo_stacks, hidden_skipbo_cards):
+            hidden.extend(stack[:nr_of_hidden_cards])
+        rng.shuffle(hidden)
+
+        for stack, nr_of_hidden_cards in zip(self.player_skipbo_stacks, hidden_skipbo_cards):
+            stack[:nr_of_hidden_cards] = array('b', hidden[:nr_of_hidden_cards])
+            del hidden[:nr_of_hidden_cards]
+        for index in range(HAND_SIZE):
+            if hand[index] != NO_CARD:
+                hand[index] = hidden.pop()
+        self.cards[:self.nr_of_cards] = array('b', hidden)
+
+        self.random.seed(rng.getrandbits(64))
+        self.__rebuild_action_mask()
 
     def get_available_actions(self, player):
+        return [divmod(action, 8) for action in actions_from_mask(self.get_available_action_mask(player))]
+
+    def get_available_action_mask(self, player):
         if self.current_player != player:
-            return []
+            return 0
         else:
-            available_actions = []
-            for play_from in range(10):
-                for play_to in range(8):
-                    if self.is_playable(player, play_from, play_to):
-                        available_actions.append((play_from, play_to))
-            return available_actions
+            return self.available_action_mask
 
     def get_remaining_skipbo_cards(self, player):
-        return len(self.player_skipbo_stacks[player])
+        return self.skipbo_stack_lengths[player]
+
+    def top_card(self, player, position):
+        """
+        Return the code of the card that can be played from the given position (see play from), or NO_CARD.
+        """
+        if position == 0:
+            length = self.skipbo_stack_lengths[player]
+            return self.player_skipbo_stacks[player][length - 1] if length > 0 else NO_CARD
+        elif position <= 5:
+            return self.player_hands[player][position - 1]
+        else:
+            index = position - 6
+            length = self.player_stack_lengths[player][index]
+            return self.player_stacks[player][index][length - 1] if length > 0 else NO_CARD
+
+    def card_below_top(self, player, index):
+        """
+        Return the code of the card directly below the top of the given player stack (0-3), or NO_CARD.
+        """
+        length = self.player_stack_lengths[player][index]
+        return self.player_stacks[player][index][length - 2] if length > 1 else NO_CARD
+
+    def center_stack_value(self, index):
+        """
+        Return the value of the top card of the given center stack, or NO_CARD when the stack is empty.
+        """
+        length = self.center_stack_lengths[index]
+        return length if length > 0 else NO_CARD
 
     def is_playable(self, player, play_from, play_to):
         if self.current_player != player:
             return False
-        elif play_from == 0:
-            # Play from skipbo stack
-            if play_to >= 4:
-                # Can't play to player stacks
-                return False
-            else:
-                # Play to center stacks
-                card_to_play = self.__top_of_stack(self.player_skipbo_stacks[player])
-                if card_to_play.card_type == 0:
-                    # Can always play skipbo card
-                    return True
-                else:
-                    top_of_stack = self.__top_of_stack(self.center_stacks[play_to])
-                    if top_of_stack is None:
-                        return card_to_play.card_type == 1
-                    else:
-                        # print(f"Card to play {card_to_play.card_type}. Top of stack {top_of_stack.actual_value}")
-                        return card_to_play.card_type - 1 == top_of_stack.actual_value
-        elif play_from < 6:
-            # Play from hand
-            index = play_from - 1
-            card_to_play = self.player_hands[player][index]
-            if card_to_play is None:
-                return False
-            elif play_to >= 4:
-                return True
-            elif play_to < 4:
-                if card_to_play.card_type == 0:
-                    # Can always play skipbo card
-                    return True
-                top_of_stack = self.__top_of_stack(self.center_stacks[play_to])
-                if top_of_stack is None:
-                    return card_to_play.card_type == 1
-                else:
-                    return card_to_play.card_type - 1 == top_of_stack.actual_value
+
+        card_to_play = self.top_card(player, play_from)
+        if card_to_play == NO_CARD:
+            return False
+        elif play_to >= 4:
+            # Only hand cards can be played to player stacks
+            return 1 <= play_from <= 5
+        elif card_to_play == SKIPBO_CARD:
+            # Can always play skipbo card
+            return True
         else:
-            # Play from player stacks
-            index = play_from - 6
-            card_to_play = self.__top_of_stack(self.player_stacks[player][index])
-            if card_to_play is None:
-                return False
-            elif play_to >= 4:
-                # Can not play from player stacks to player stacks
-                return False
-            elif play_to < 4:
-                if card_to_play.card_type == 0:
-                    # Can always play skipbo card
-                    return True
-                top_of_stack = self.__top_of_stack(self.center_stacks[play_to])
-                if top_of_stack is None:
-                    return card_to_play.card_type == 1
-                else:
-                    return card_to_play.card_type - 1 == top_of_stack.actual_value
-
-        return False
+            return card_to_play == self.center_stack_lengths[play_to] + 1
 
     def cards_in_game(self):
-        cards = 0
-        cards += len(self.cards)
-        cards += len(self.discarded)
-        cards += len(self.player_skipbo_stacks[0])
-        cards += len(self.player_skipbo_stacks[1])
-        cards += 1 if self.player_hands[0][0] is not None else 0
-        cards += 1 if self.player_hands[0][1] is not None else 0
-        cards += 1 if self.player_hands[0][2] is not None else 0
-        cards += 1 if self.player_hands[0][3] is not None else 0
-        cards += 1 if self.player_hands[0][4] is not None else 0
-        cards += 1 if self.player_hands[1][0] is not None else 0
-        cards += 1 if self.player_hands[1][1] is not None else 0
-        cards += 1 if self.player_hands[1][2] is not None else 0
-        cards += 1 if self.player_hands[1][3] is not None else 0
-        cards += 1 if self.player_hands[1][4] is not None else 0
-        cards += len(self.player_stacks[0][0])
-        cards += len(self.player_stacks[0][1])
-        cards += len(self.player_stacks[0][2])
-        cards += len(self.player_stacks[0][3])
-        cards += len(self.player_stacks[1][0])
-        cards += len(self.player_stacks[1][1])
-        cards += len(self.player_stacks[1][2])
-        cards += len(self.player_stacks[1][3])
-        cards += len(self.center_stacks[0])
-        cards += len(self.center_stacks[1])
-        cards += len(self.center_stacks[2])
-        cards += len(self.center_stacks[3])
+        cards = self.nr_of_cards + self.nr_of_discarded
+        for player in range(2):
+            cards += self.skipbo_stack_lengths[player]
+            cards += HAND_SIZE - self.player_hands[player].count(NO_CARD)
+            cards += sum(self.player_stack_lengths[player])
+        cards += sum(self.center_stack_lengths)
         return cards
 
-    def __top_of_stack(self, stack):
-        if len(stack) == 0:
-            return None
-        else:
-            return stack[0]
-
     def __hand_is_empty(self, player):
-        return self.player_hands[player].count(None) == 5
+        return self.player_hands[player].count(NO_CARD) == HAND_SIZE
 
     def play_card(self, play_from, play_to):
         card = self.__take_card(play_from)
@@ -193,105 +292,153 @@ class SkipBoGame:
                 return False
         return True
 
-    def refill_hand(self, player):
-        nr_of_new_cards = self.player_hands[player].count(None)
+    def refill_hand(self, player, update_action_mask=True):
+        hand = self.player_hands[player]
+        nr_of_new_cards = hand.count(NO_CARD)
         new_cards = self.draw_cards(nr_of_new_cards)
 
         # Not enough cards remaining. Game is finished.
         if len(new_cards) < nr_of_new_cards:
             return False
 
-        for index, card in enumerate(self.player_hands[player]):
-            if card is None:
-                self.player_hands[player][index] = new_cards.pop()
+        for index in range(HAND_SIZE):
+            if hand[index] == NO_CARD:
+                hand[index] = new_cards.pop()
+
+        if update_action_mask and player == self.current_player:
+            for position in range(1, 6):
+                self.__update_action_mask_row(position)
 
         return True
 
     def put_card(self, card, play_to):
         if play_to < 4:
             # play to center stacks
-            played_card = card
-            if card.card_type == 0:
-                top_of_stack = self.__top_of_stack(self.center_stacks[play_to])
-                if top_of_stack is None:
-                    played_card.actual_value = 1
-                else:
-                    played_card.actual_value = top_of_stack.actual_value + 1
-
-            if played_card.actual_value == 12:
-                self.center_stacks[play_to].insert(0, played_card)
-                if len(self.center_stacks[play_to]) < 12:
-                    print(f"Discarded: {list(map(lambda x: self.__visualize_card(x), self.center_stacks[play_to]))}")
-                self.discarded.extend(self.center_stacks[play_to])
-                self.center_stacks[play_to] = []
-            else:
-                self.center_stacks[play_to].insert(0, played_card)
-
-            if not validate_stack(self.center_stacks[play_to]):
-                print(f"Invalid stack: {list(map(lambda x: self.__visualize_card(x), self.center_stacks[play_to]))}")
-
+            length = self.center_stack_lengths[play_to]
+            if card != SKIPBO_CARD and card != length + 1:
+                print(f"Invalid stack: card {self.__visualize_card(card)} played on a center stack of {length} cards")
+
+            stack = self.center_stacks[play_to]
+            stack[length] = card
+            length += 1
+
+            if length == CENTER_STACK_SIZE:
+                end = self.nr_of_discarded + CENTER_STACK_SIZE
+                self.discarded[self.nr_of_discarded:end] = stack
+                self.nr_of_discarded = end
+                length = 0
+
+            self.__set_center_stack_length(play_to, length)
+            self.__update_action_mask_column(play_to)
         else:
             # play to player stacks
             index = play_to - 4
-            self.player_stacks[self.current_player][index].insert(0, card)
+            lengths = self.player_stack_lengths[self.current_player]
+            self.player_stacks[self.current_player][index][lengths[index]] = card
+            lengths[index] += 1
+            self.__update_action_mask_row(6 + index)
 
     def switch_turn(self):
         self.current_player = 1 if self.current_player == 0 else 0
-        return self.refill_hand(self.current_player)
+        # The mask is rebuilt for the new player anyway
+        could_refill_hand = self.refill_hand(self.current_player, update_action_mask=False)
+        self.__rebuild_action_mask()
+        return could_refill_hand
+
+    def __set_center_stack_length(self, index, length):
+        bit = 1 << index
+        self.center_targets[self.center_stack_lengths[index] + 1] &= ~bit
+        self.center_targets[length + 1] |= bit
+        self.center_stack_lengths[index] = length
+
+    def __action_mask_row(self, position):
+        card = self.top_card(self.current_player, position)
+        if card == NO_CARD:
+            return 0
+        elif 1 <= position <= 5:
+            return self.center_targets[card] | PLAYER_STACK_TARGETS
+        else:
+            return self.center_targets[card]
+
+    def __update_action_mask_row(self, position):
+        shift = 8 * position
+        mask = self.available_action_mask & ~(0xFF << shift)
+        self.available_action_mask = mask | (self.__action_mask_row(position) << shift)
+
+    def __update_action_mask_column(self, play_to):
+        mask = self.available_action_mask
+        center_bit = 1 << play_to
+        for position in range(10):
+            card = self.top_card(self.current_player, position)
+            action_bit = 1 << (8 * position + play_to)
+            if card != NO_CARD and self.center_targets[card] & center_bit:
+                mask |= action_bit
+            else:
+                mask &= ~action_bit
+        self.available_action_mask = mask
+
+    def __rebuild_action_mask(self):
+        # Reads the top cards directly instead of through __action_mask_row, this runs on every turn switch
+        player = self.current_player
+        targets = self.center_targets
+        mask = 0
+
+        length = self.skipbo_stack_lengths[player]
+        if length > 0:
+            mask = targets[self.player_skipbo_stacks[player][length - 1]]
+        shift = 8
+        for card in self.player_hands[player]:
+            if card != NO_CARD:
+                mask |= (targets[card] | PLAYER_STACK_TARGETS) << shift
+            shift += 8
+        for stack, length in zip(self.player_stacks[player], self.player_stack_lengths[player]):
+            if length > 0:
+                mask |= targets[stack[length - 1]] << shift
+            shift += 8
+
+        self.available_action_mask = mask
 
     def __take_card(self, play_from):
+        player = self.current_player
         if play_from == 0:
             # play from skipbo stack
-            return self.player_skipbo_stacks[self.current_player].pop(0)
+            self.skipbo_stack_lengths[player] -= 1
+            card = self.player_skipbo_stacks[player][self.skipbo_stack_lengths[player]]
         elif 1 <= play_from <= 5:
             # play from hand
             index = play_from - 1
-            card = self.player_hands[self.current_player][index]
-            self.player_hands[self.current_player][index] = None
-            return card
-        elif 6 <= play_from <= 9:
+            card = self.player_hands[player][index]
+            self.player_hands[player][index] = NO_CARD
+        else:
             # play from player stacks
             index = play_from - 6
-            return self.player_stacks[self.current_player][index].pop(0)
+            lengths = self.player_stack_lengths[player]
+            lengths[index] -= 1
+            card = self.player_stacks[player][index][lengths[index]]
+
+        self.__update_action_mask_row(play_from)
+        return card
 
     def __visualize_position(self, player, position):
         if player is None:
             # get from center stacks
-            card = None
-            if len(self.center_stacks[position]) > 0:
-                card = self.center_stacks[position][0]
+            length = self.center_stack_lengths[position]
+            card = self.center_stacks[position][length - 1] if length > 0 else NO_CARD
             return self.__visualize_card(card)
         else:
-            if position == 0:
-                # get from skipbo stack
-                card = None
-                if len(self.player_skipbo_stacks[player]) > 0:
-                    card = self.player_skipbo_stacks[player][0]
-                return self.__visualize_card(card)
-            elif 1 <= position <= 5:
-                # get from hand
-                index = position - 1
-                card = self.player_hands[player][index]
-                return self.__visualize_card(card)
-            elif 6 <= position <= 9:
-                # get from player stacks
-                index = position - 6
-                card = None
-                if len(self.player_stacks[player][index]) > 0:
-                    card = self.player_stacks[player][index][0]
-                return self.__visualize_card(card)
+            return self.__visualize_card(self.top_card(player, position))
 
     def __visualize_card(self, card):
-        if card is None:
+        if card == NO_CARD:
             return 'xx'
-        elif card.card_type == 0:
+        elif card == SKIPBO_CARD:
             return 'sb'
         else:
-            return format(card.card_type, '02d')
+            return format(card, '02d')
 
     def visualize(self):
         print(
-            f"{self.__visualize_position(0, 0)} [{format(len(self.player_skipbo_stacks[0]), '2d')}]     {self.__visualize_position(0, 1)} {self.__visualize_position(0, 2)} {self.__visualize_position(0, 3)} {self.__visualize_position(0, 4)} {self.__visualize_position(0, 5)}")
+            f"{self.__visualize_position(0, 0)} [{format(self.skipbo_stack_lengths[0], '2d')}]     {self.__visualize_position(0, 1)} {self.__visualize_position(0, 2)} {self.__visualize_position(0, 3)} {self.__visualize_position(0, 4)} {self.__visualize_position(0, 5)}")
         print(f"                               {'<-- turn' if self.current_player == 0 else ''}")
         print(
             f"             {self.__visualize_position(0, 6)} {self.__visualize_position(0, 7)} {self.__visualize_position(0, 8)} {self.__visualize_position(0, 9)}")
@@ -305,4 +452,4 @@ class SkipBoGame:
             f"             {self.__visualize_position(1, 6)} {self.__visualize_position(1, 7)} {self.__visualize_position(1, 8)} {self.__visualize_position(1, 9)}")
         print(f"                               {'<-- turn' if self.current_player == 1 else ''}")
         print(
-            f"{self.__visualize_position(1, 0)} [{format(len(self.player_skipbo_stacks[1]), '2d')}]     {self.__visualize_position(1, 1)} {self.__visualize_position(1, 2)} {self.__visualize_position(1, 3)} {self.__visualize_position(1, 4)} {self.__visualize_position(1, 5)}")
+            f"{self.__visualize_position(1, 0)} [{format(self.skipbo_stack_lengths[1], '2d')}]     {self.__visualize_position(1, 1)} {self.__visualize_position(1, 2)} {self.__visualize_position(1, 3)} {self.__visualize_position(1, 4)} {self.__visualize_position(1, 5)}")
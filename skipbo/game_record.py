@@ -0,0 +1,88 @@
+import os
+import struct
+
+from skipbo.game.skipbo_game import SkipBoGame
+
+MAGIC = b"SKBR"
+VERSION = 1
+# Seed of the game and the number of moves, followed by one byte per move (the action in rl notation)
+RECORD_HEADER = struct.Struct("<QH")
+
+
+class GameRecorder:
+    """
+    Appends played games to a binary file. A game is stored as its seed and its actions, 10 bytes plus one byte per
+    move, since a seeded SkipBoGame replays the same game from them (see GameRecords.replay). The file starts with
+    the magic bytes SKBR and a version byte.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        directory = os.path.dirname(file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        new_file = not os.path.exists(file) or os.path.getsize(file) == 0
+        self.output = open(file, "ab")
+        if new_file:
+            self.output.write(MAGIC + bytes([VERSION]))
+
+    def record(self, seed, actions):
+        """
+        Append a game given its seed (an integer from 0 to 2^64 - 1) and the list of actions that were played.
+        """
+        self.output.write(RECORD_HEADER.pack(seed, len(actions)))
+        self.output.write(bytes(actions))
+
+    def flush(self):
+        self.output.flush()
+
+    def close(self):
+        self.output.close()
+
+
+class GameRecords:
+
+    @staticmethod
+    def read(file):
+        """
+        Yield the seed and the actions (as bytes) of every game in a file written by GameRecorder.
+        """
+        with open(file, "rb") as input_file:
+            header = input_file.read(len(MAGIC) + 1)
+            if header[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{file} is not a Skip-Bo game record file")
+            if header[len(MAGIC)] != VERSION:
+                raise ValueError(f"{file} has version {header[len(MAGIC)]}, expected {VERSION}")
+
+            while True:
+                record_header = input_file.read(RECORD_HEADER.size)
+                if len(record_header) < RECORD_HEADER.size:
+                    return
+                seed, nr_of_moves = RECORD_HEADER.unpack(record_header)
+                actions = input_file.read(nr_of_moves)
+                if len(actions) < nr_of_moves:
+                    # A game that was cut off while it was written
+                    return
+                yield seed, actions
+
+    @staticmethod
+    def count_moves(file):
+        """
+        Return the number of games and the total number of moves in a file, without replaying the games.
+        """
+        nr_of_games = 0
+        nr_of_moves = 0
+        for _, actions in GameRecords.read(file):
+            nr_of_games += 1
+            nr_of_moves += len(actions)
+        return nr_of_games, nr_of_moves
+
+    @staticmethod
+    def replay(seed, actions, nr_of_moves=None):
+        """
+        Return the game in the position after the first nr_of_moves actions (all actions by default).
+        """
+        game = SkipBoGame(seed)
+        for action in actions[:nr_of_moves]:
+            game.play_card(*divmod(action, 8))
+        return game
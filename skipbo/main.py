@@ -1,12 +1,20 @@
+import os
+
 from skipbo.dqn_agent import DqnAgent
 from skipbo.dqn_agent_parameters import DqnAgentParameters
+from skipbo.metrics_logger import MetricsLogger
 from skipbo.model import ModelManager
+from skipbo.profiler import Profiler
 from skipbo.skipbo_env import SkipboEnv
 
+# SKIPBO_PROFILE=1 writes a timing summary of every 100 games to models/profile.jsonl
+profiler = Profiler(enabled=os.environ.get("SKIPBO_PROFILE") == "1", log_file="models/profile.jsonl")
+logger = MetricsLogger("models/metrics.csv")
+
 learning_rate = 0.001
 regularization_factor = 0.001
 
-model1 = ModelManager.create_model(355, 80, learning_rate, regularization_factor)
+model1 = ModelManager.create_model(SkipboEnv.observation_size, SkipboEnv.action_size, learning_rate, regularization_factor)
 parameters1 = DqnAgentParameters({
     "starting_epsilon": 1.0,
     "epsilon_decay": 0.995,
@@ -19,9 +27,9 @@ parameters1 = DqnAgentParameters({
     "discount_factor": 0.995,
     "backup_frequency_steps": 2000
 })
-agent1 = DqnAgent("Emily", model1, parameters1)
+agent1 = DqnAgent("Emily", model1, parameters1, profiler, logger)
 
-model2 = ModelManager.create_model(355, 80, learning_rate, regularization_factor)
+model2 = ModelManager.create_model(SkipboEnv.observation_size, SkipboEnv.action_size, learning_rate, regularization_factor)
 parameters2 = DqnAgentParameters({
     "starting_epsilon": 1.0,
     "epsilon_decay": 0.995,
@@ -34,8 +42,13 @@ parameters2 = DqnAgentParameters({
     "discount_factor": 0.995,
     "backup_frequency_steps": 2000
 })
-agent2 = DqnAgent("James", model2, parameters2)
+agent2 = DqnAgent("James", model2, parameters2, profiler, logger)
 
-environment = SkipboEnv()
+environment = SkipboEnv(profiler, logger)
 for i in range(10000):
     environment.play([agent1, agent2], {"episode": i})
+
+# Wait for the checkpoints that are still being written
+agent1.checkpoint_manager.close()
+agent2.checkpoint_manager.close()
+logger.close()
@@ -0,0 +1,32 @@
+import os
+
+from skipbo.actor_learner import ActorLearner
+from skipbo.dqn_agent import DqnAgent
+from skipbo.dqn_agent_parameters import DqnAgentParameters
+from skipbo.model import ModelManager
+from skipbo.skipbo_env import SkipboEnv
+
+learning_rate = 0.001
+regularization_factor = 0.001
+
+parameters = DqnAgentParameters({
+    "starting_epsilon": 1.0,
+    "epsilon_decay": 0.995,
+    "minimum_epsilon": 0.01,
+    "epsilon_decay_factor_per_episode": 0.995,
+    "replay_buffer_size": 250000,
+    "target_network_replace_frequency_steps": 1000,
+    "training_batch_size": 256,
+    "training_start": 256,
+    "discount_factor": 0.995,
+    "backup_frequency_steps": 2000
+})
+
+if __name__ == "__main__":
+    # Only the learner loads TensorFlow, the spawned actor processes import this module without running this block
+    model = ModelManager.create_model(SkipboEnv.observation_size, SkipboEnv.action_size, learning_rate, regularization_factor)
+    learner = DqnAgent("Learner", model, parameters)
+
+    actor_learner = ActorLearner(learner, parameters, nr_of_actors=max(1, os.cpu_count() - 1))
+    actor_learner.run(10000)
+    learner.checkpoint_manager.close()
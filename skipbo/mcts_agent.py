@@ -0,0 +1,133 @@
+import random
+import time
+
+import numpy as np
+
+from skipbo.action_mask import ActionMask
+from skipbo.agent import Agent
+from skipbo.game.skipbo_game import NR_OF_ACTIONS
+from skipbo.observation_encoder import OBSERVATION_SIZE, ObservationEncoder
+from skipbo.q_functions import QFunctions
+from skipbo.search_tree import SearchTree
+from skipbo.skipbo_env import SkipboEnv
+
+
+class MctsAgent(Agent):
+
+    def __init__(self, name: str, model, node_budget=2000, time_budget=None, determinizations=4, batch_size=32,
+                 exploration=1.0, discount_factor=0.995, seed=None):
+        """
+        Agent that searches the moves of its turn with Monte Carlo Tree Search and evaluates the leaves with the
+        Q-values of the model (a Keras model, a NumpyModel or a QValueCache). The environment has to pass the game in
+        extra["game"], without it the agent plays the greedy action like TrainedDqnAgent.
+
+        The hidden cards are shuffled into a number of determinizations that are searched as separate trees, the
+        action with the best average estimate at the roots is played. node_budget limits the number of nodes per
+        move (divided over the trees) and time_budget the search time per move in seconds. Every round of the search
+        evaluates up to batch_size leaves of all trees with one call to the model.
+
+        The search only helps when the Q-values are accurate: explored moves are rated with the maximum over noisy
+        estimates of their children, while the moves that end the turn keep their own estimate. With the models
+        trained so far it plays worse than the greedy action, see skipbo.benchmarks.mcts.
+        """
+        super().__init__()
+        self.name = name
+        self.model = model
+        self.time_budget = time_budget
+        self.batch_size = batch_size
+        self.exploration = exploration
+        self.random = random.Random(seed)
+        self.trees = [SearchTree(max(node_budget // determinizations, 1), NR_OF_ACTIONS, discount_factor)
+                      for _ in range(determinizations)]
+        self.observations = np.zeros((batch_size, OBSERVATION_SIZE), dtype=np.float32)
+        self.episode_reward = 0
+
+    def action(self, observation, allowed_actions, reward, extra):
+        if reward != 0:
+            self.episode_reward += reward
+
+        action_mask = ActionMask.from_agent_arguments(allowed_actions, extra)
+        game = extra.get("game") if extra is not None else None
+        q_values = QFunctions.get_q_values(self.model, observation)
+        if game is None or np.count_nonzero(action_mask) == 1:
+            return QFunctions.select_best_action(q_values, action_mask)
+
+        return self.search(game, q_values, action_mask)
+
+    def search(self, game, q_values, action_mask):
+        """
+        Return the best action for the current player of the game, given the Q-values and bool action mask of the
+        current state. The game itself is not changed.
+        """
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        player = game.current_player
+
+        games = []
+        for tree in self.trees:
+            determinized_game = game.copy()
+            determinized_game.determinize(player, self.random)
+            tree.reset()
+            tree.add_node(-1, 0, 0, determinized_game.snapshot())
+            tree.expand(0, q_values, action_mask)
+            games.append(determinized_game)
+
+        leaves_per_tree = max(self.batch_size // len(self.trees), 1)
+        while deadline is None or time.perf_counter() < deadline:
+            leaves = []
+            for tree, determinized_game in zip(self.trees, games):
+                self.__select_leaves(tree, determinized_game, player, leaves_per_tree, leaves)
+            if not leaves:
+                # Every tree is exhausted or full
+                break
+            self.__evaluate_leaves(leaves)
+
+        root_values = np.mean([tree.edge_values[0] for tree in self.trees], axis=0)
+        return QFunctions.select_best_action(root_values, action_mask)
+
+    def __select_leaves(self, tree, game, player, nr_of_leaves, leaves):
+        """
+        Walk down the tree and add a new node up to nr_of_leaves times. The new nodes are added to leaves as
+        (tree, node, action mask), with the observation of the node in the next row of self.observations.
+        """
+        for _ in range(nr_of_leaves):
+            if tree.is_full() or tree.exhausted[0] or len(leaves) == self.batch_size:
+                return
+
+            node = 0
+            action = tree.select_edge(node, self.exploration)
+            while action >= 0 and tree.children[node, action] >= 0:
+                tree.visit(node, action)
+                node = tree.children[node, action]
+                action = tree.select_edge(node, self.exploration)
+            if action < 0:
+                # The remaining open edges lead to leaves that are waiting for their evaluation
+                return
+            tree.visit(node, action)
+
+            game.restore(tree.snapshots[node])
+            rewards, done = SkipboEnv.play_action(game, action)
+            leaf = tree.add_node(node, action, rewards[player], game.snapshot())
+            if done:
+                tree.expand_terminal(leaf)
+                leaves.append((tree, leaf, None))
+            else:
+                ObservationEncoder.encode(game, player, out=self.observations[len(leaves)])
+                leaves.append((tree, leaf, ActionMask.to_array(game.get_available_action_mask(player))))
+
+    def __evaluate_leaves(self, leaves):
+        q_values = QFunctions.get_multiple_q_values(self.model, self.observations[:len(leaves)])
+        for index, (tree, leaf, action_mask) in enumerate(leaves):
+            if action_mask is not None:
+                tree.expand(leaf, q_values[index], action_mask)
+        for tree, leaf, _ in leaves:
+            tree.backup(leaf)
+
+    def done(self, final_observation, reward):
+        if reward != 0:
+            self.episode_reward += reward
+
+        print(f"{self.name} got a total reward of {self.episode_reward}.")
+        self.reset_after_episode()
+
+    def reset_after_episode(self):
+        self.episode_reward = 0
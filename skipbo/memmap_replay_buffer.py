@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+
+from skipbo.replay_buffer import ReplayBuffer
+
+# Fields of the header file
+CURRENT_INDEX = 0
+NR_OF_TRANSITIONS = 1
+SIZE = 2
+STATE_SIZE = 3
+
+
+class MemmapReplayBuffer(ReplayBuffer):
+    """
+    Replay buffer whose arrays are memory mapped .npy files in the given directory, so it survives restarts and
+    can be larger than the available memory. A small header file holds the write index and the number of stored
+    transitions and is updated after every added transition.
+
+    When the directory already contains a buffer of the same size it is reopened without copying and new
+    transitions are appended after the existing ones.
+    """
+
+    def __init__(self, directory, size=10000, state_size=355):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        header_file = os.path.join(directory, "header.npy")
+        self.reopen = os.path.exists(header_file)
+        if self.reopen:
+            self.header = np.load(header_file, mmap_mode="r+")
+            if self.header[SIZE] != size or self.header[STATE_SIZE] != state_size:
+                raise ValueError(f"Replay buffer in {directory} has size {self.header[SIZE]} and state size "
+                                 f"{self.header[STATE_SIZE]}, expected {size} and {state_size}")
+        else:
+            self.header = np.lib.format.open_memmap(header_file, mode="w+", dtype=np.int64, shape=(4,))
+            self.header[SIZE] = size
+            self.header[STATE_SIZE] = state_size
+
+        super().__init__(size, state_size)
+        self.current_index = int(self.header[CURRENT_INDEX])
+        self.nr_of_transitions = int(self.header[NR_OF_TRANSITIONS])
+
+    @staticmethod
+    def open(directory):
+        """
+        Reopen an existing buffer with the size and state size stored in its header.
+        """
+        header = np.load(os.path.join(directory, "header.npy"))
+        return MemmapReplayBuffer(directory, int(header[SIZE]), int(header[STATE_SIZE]))
+
+    def create_array(self, name, shape, dtype):
+        file = os.path.join(self.directory, f"{name}.npy")
+        if self.reopen:
+            return np.load(file, mmap_mode="r+")
+        else:
+            return np.lib.format.open_memmap(file, mode="w+", dtype=dtype, shape=shape)
+
+    def add(self, transition):
+        super().add(transition)
+        self.header[CURRENT_INDEX] = self.current_index
+        self.header[NR_OF_TRANSITIONS] = self.nr_of_transitions
+
+    def flush(self):
+        for array in [self.old_states, self.allowed_action_masks, self.actions, self.rewards, self.new_states,
+                      self.dones, self.header]:
+            array.flush()
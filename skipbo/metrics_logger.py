@@ -0,0 +1,95 @@
+import os
+import time
+
+COLUMNS = ["episode", "agent", "reward", "average_reward", "game_length", "remaining_skipbo_cards", "epsilon",
+           "steps_per_s", "updates_per_s"]
+
+
+class RollingAverage:
+    """
+    Average of the last window values, updated in O(1) with a ring buffer and a running sum.
+    """
+
+    def __init__(self, window):
+        self.values = [0.0] * window
+        self.index = 0
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, value):
+        self.sum += value - self.values[self.index]
+        self.values[self.index] = value
+        self.index = (self.index + 1) % len(self.values)
+        self.count = min(self.count + 1, len(self.values))
+
+    def average(self):
+        return self.sum / self.count if self.count > 0 else 0.0
+
+
+class MetricsLogger:
+    """
+    Buffered CSV log with one row per agent per episode. Rows are kept in memory and appended to the file with one
+    write when flush_frequency_episodes episodes are buffered or flush_interval_seconds have passed, so logging
+    costs no I/O per game. The file gets a header when it is created and can be read with any CSV reader, like
+    pandas.read_csv.
+
+    Next to the logged values the logger keeps the average reward of the last window episodes per agent.
+    """
+
+    def __init__(self, file, flush_frequency_episodes=100, flush_interval_seconds=30.0, window=100):
+        self.file = file
+        self.flush_frequency_episodes = flush_frequency_episodes
+        self.flush_interval_seconds = flush_interval_seconds
+        self.window = window
+        self.rows = []
+        self.nr_of_buffered_episodes = 0
+        self.last_flush = time.monotonic()
+        self.average_rewards = {}
+
+        directory = os.path.dirname(file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(file) or os.path.getsize(file) == 0:
+            with open(file, "w") as output:
+                output.write(",".join(COLUMNS) + "\n")
+
+    def log_episode(self, episode, agent_names, rewards, game_length, remaining_skipbo_cards, epsilons,
+                    steps_per_second, updates_per_second):
+        """
+        Add the rows of an episode, with the values per agent given as lists in the order of agent_names. Epsilon
+        and the environment and gradient steps per second are None for agents that do not train.
+        """
+        for name, reward, remaining, epsilon, steps, updates in zip(
+                agent_names, rewards, remaining_skipbo_cards, epsilons, steps_per_second, updates_per_second):
+            average_reward = self.average_rewards.get(name)
+            if average_reward is None:
+                average_reward = RollingAverage(self.window)
+                self.average_rewards[name] = average_reward
+            average_reward.add(reward)
+            self.rows.append(f"{episode},{name},{reward:.4f},{average_reward.average():.4f},{game_length},"
+                             f"{remaining},{MetricsLogger.__format(epsilon, 6)},{MetricsLogger.__format(steps, 1)},"
+                             f"{MetricsLogger.__format(updates, 1)}\n")
+
+        self.nr_of_buffered_episodes += 1
+        if self.nr_of_buffered_episodes >= self.flush_frequency_episodes or \
+                time.monotonic() - self.last_flush >= self.flush_interval_seconds:
+            self.flush()
+
+    @staticmethod
+    def __format(value, decimals):
+        return "" if value is None else f"{value:.{decimals}f}"
+
+    def average_reward(self, agent_name):
+        average_reward = self.average_rewards.get(agent_name)
+        return average_reward.average() if average_reward is not None else 0.0
+
+    def flush(self):
+        if self.rows:
+            with open(self.file, "a") as output:
+                output.write("".join(self.rows))
+        self.rows = []
+        self.nr_of_buffered_episodes = 0
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
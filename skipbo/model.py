@@ -1,17 +1,21 @@
-import shutil
-import uuid
-import tensorflow as tf
-
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import Dense
-from tensorflow.keras.regularizers import l2
-import tensorflow.keras.backend as K
+from skipbo.numpy_model import NumpyModel
 
 
 class ModelManager:
+    """
+    Builds, trains and copies Keras models. TensorFlow is imported by the methods that need it, so importing this
+    module (and the environment or agents that only use NumpyModel) does not load it.
+    """
 
     @staticmethod
     def masked_huber_loss(mask_value, clip_delta):
+        """
+        Huber loss over the outputs whose target differs from mask_value, averaged per sample so sample weights
+        (like importance sampling weights) apply to each sample separately.
+        """
+        import tensorflow as tf
+        import tensorflow.keras.backend as K
+
         def f(y_true, y_pred):
             error = y_true - y_pred
             cond = K.abs(error) < clip_delta
@@ -19,13 +23,18 @@ class ModelManager:
             masked_squared_error = 0.5 * K.square(mask_true * (y_true - y_pred))
             linear_loss = mask_true * (clip_delta * K.abs(error) - 0.5 * (clip_delta ** 2))
             huber_loss = tf.where(cond, masked_squared_error, linear_loss)
-            return K.sum(huber_loss) / K.sum(mask_true)
+            return K.sum(huber_loss, axis=-1) / K.maximum(K.sum(mask_true, axis=-1), 1.0)
 
         f.__name__ = 'masked_huber_loss'
         return f
 
     @staticmethod
     def create_model(inputs, outputs, learning_rate, regularization_factor):
+        import tensorflow as tf
+        from tensorflow.keras.layers import Dense
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.regularizers import l2
+
         model = Sequential([
             Dense(256, input_shape=(inputs, ), activation="relu", kernel_regularizer=l2(regularization_factor)),
             Dense(128, activation="relu", kernel_regularizer=l2(regularization_factor)),
@@ -38,11 +47,107 @@ class ModelManager:
 
         return model
 
+    @staticmethod
+    def create_train_step(model, target_model, discount_factor):
+        """
+        Return a compiled Double DQN training step on a batch of state transitions. The best action in the new state
+        is selected by the model among the allowed actions (illegal actions are masked with -inf) and valued by the
+        target model. The step fits the model on these targets with the masked huber loss, weighted per sample, and
+        returns the TD errors of the batch before the update.
+        """
+        import tensorflow as tf
+
+        loss_function = ModelManager.masked_huber_loss(0.0, 1.0)
+        nr_of_actions = model.output_shape[-1]
+
+        @tf.function
+        def train_step(states, actions, rewards, new_states, dones, allowed_action_masks, weights):
+            q_values_new_state = model(new_states, training=False)
+            q_values_new_state_target_model = target_model(new_states, training=False)
+
+            allowed_q_values_new_state = tf.where(allowed_action_masks, q_values_new_state, float("-inf"))
+            best_actions = tf.argmax(allowed_q_values_new_state, axis=1, output_type=tf.int32)
+            best_action_next_state_q_values = tf.gather(q_values_new_state_target_model, best_actions, batch_dims=1)
+            target_values = tf.where(dones, rewards, rewards + discount_factor * best_action_next_state_q_values)
+            targets = tf.one_hot(actions, nr_of_actions) * target_values[:, tf.newaxis]
+
+            with tf.GradientTape() as tape:
+                q_values = model(states, training=True)
+                losses = loss_function(targets, q_values)
+                loss = tf.reduce_sum(losses * weights) / tf.cast(tf.shape(losses)[0], tf.float32)
+                if model.losses:
+                    loss += tf.add_n(model.losses)
+
+            gradients = tape.gradient(loss, model.trainable_variables)
+            model.optimizer.apply_gradients(zip(gradients, model.trainable_variables))
+
+            return target_values - tf.gather(q_values, actions, batch_dims=1)
+
+        return train_step
+
     @staticmethod
     def copy_model(model):
-        backup_file = 'backup_' + str(uuid.uuid4())
-        model.save(backup_file)
-        new_model = load_model(backup_file,
-                               custom_objects={'masked_huber_loss': ModelManager.masked_huber_loss(0.0, 1.0)})
-        shutil.rmtree(backup_file)
+        """
+        Return a new model with the same architecture and a copy of the weights, without going through disk.
+        """
+        import tensorflow as tf
+
+        # Built from the config instead of clone_model, which also restores the compile state under Keras 3 and
+        # fails on the unregistered masked_huber_loss
+        new_model = tf.keras.Sequential.from_config(model.get_config())
+        new_model.build(model.input_shape)
+        new_model.set_weights(model.get_weights())
         return new_model
+
+    @staticmethod
+    def create_target_model_update(model, target_model, tau=1.0):
+        """
+        Return a compiled function that copies the weights of the model into the target model in memory. With
+        tau < 1 the weights are blended instead (Polyak averaging): target = tau * model + (1 - tau) * target.
+        """
+        import tensorflow as tf
+
+        @tf.function
+        def update_target_model():
+            for weight, target_weight in zip(model.weights, target_model.weights):
+                target_weight.assign(tau * weight + (1.0 - tau) * target_weight)
+
+        return update_target_model
+
+    @staticmethod
+    def get_optimizer_state(model):
+        """
+        Return a copy of the variables of the optimizer of the model (like the iteration count and the moments of
+        Adam) as a list of arrays. The optimizer is built first if it has not been used yet, so the state is complete
+        before the first training step as well.
+        """
+        return [variable.numpy() for variable in ModelManager.__optimizer_variables(model)]
+
+    @staticmethod
+    def set_optimizer_state(model, state):
+        """
+        Restore optimizer variables returned by get_optimizer_state.
+        """
+        if not state:
+            return
+        variables = ModelManager.__optimizer_variables(model)
+        if len(variables) != len(state):
+            raise ValueError(f"The optimizer has {len(variables)} variables, the saved state has {len(state)}")
+        for variable, value in zip(variables, state):
+            variable.assign(value)
+
+    @staticmethod
+    def __optimizer_variables(model):
+        # Building creates the moments of every trainable variable, it does nothing when the optimizer is built
+        model.optimizer.build(model.trainable_variables)
+        variables = model.optimizer.variables
+        # Legacy Keras optimizers have a variables method instead of a property
+        return variables() if callable(variables) else variables
+
+    @staticmethod
+    def export_weights(model, file):
+        """
+        Save the kernels, biases and activations of the dense layers of the model to a .npz file, which can be loaded
+        with NumpyModel.load without TensorFlow.
+        """
+        NumpyModel.from_keras_model(model).save(file)
@@ -0,0 +1,70 @@
+import numpy as np
+
+ACTIVATIONS = {
+    "relu": lambda x: np.maximum(x, 0, out=x),
+    "linear": lambda x: x,
+}
+
+
+class NumpyModel:
+    """
+    Forward pass of a stack of dense layers in NumPy, for models exported with ModelManager.export_weights. It can
+    be used wherever QFunctions expects a model, without importing TensorFlow.
+    """
+
+    def __init__(self, kernels, biases, activations):
+        for activation in activations:
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation {activation}")
+        self.kernels = kernels
+        self.biases = biases
+        self.activations = activations
+        # Incremented by set_weights, so caches of predictions (like QValueCache) know when they are outdated
+        self.weights_version = 0
+
+    @staticmethod
+    def from_keras_model(model):
+        """
+        Return a NumpyModel with a copy of the weights of a Keras model consisting of dense layers.
+        """
+        kernels = []
+        biases = []
+        activations = []
+        for layer in model.layers:
+            kernel, bias = layer.get_weights()
+            kernels.append(kernel)
+            biases.append(bias)
+            activations.append(layer.activation.__name__)
+        return NumpyModel(kernels, biases, activations)
+
+    @staticmethod
+    def load(file):
+        with np.load(file) as data:
+            activations = [str(activation) for activation in data["activations"]]
+            kernels = [data[f"kernel_{index}"].astype(np.float32) for index in range(len(activations))]
+            biases = [data[f"bias_{index}"].astype(np.float32) for index in range(len(activations))]
+        return NumpyModel(kernels, biases, activations)
+
+    def save(self, file):
+        arrays = {}
+        for index, (kernel, bias) in enumerate(zip(self.kernels, self.biases)):
+            arrays[f"kernel_{index}"] = kernel
+            arrays[f"bias_{index}"] = bias
+        np.savez(file, activations=np.array(self.activations), **arrays)
+
+    def get_weights(self):
+        weights = []
+        for kernel, bias in zip(self.kernels, self.biases):
+            weights.extend([kernel, bias])
+        return weights
+
+    def set_weights(self, weights):
+        self.kernels = [np.asarray(weight, dtype=np.float32) for weight in weights[0::2]]
+        self.biases = [np.asarray(weight, dtype=np.float32) for weight in weights[1::2]]
+        self.weights_version += 1
+
+    def predict_q_values(self, states):
+        x = np.asarray(states, dtype=np.float32)
+        for kernel, bias, activation in zip(self.kernels, self.biases, self.activations):
+            x = ACTIVATIONS[activation](x @ kernel + bias)
+        return x
@@ -0,0 +1,70 @@
+import numpy as np
+
+from skipbo.game.card import NO_CARD
+
+NR_OF_CARD_TYPES = 13
+NR_OF_POSITIONS = 27
+OBSERVATION_SIZE = 3 + NR_OF_CARD_TYPES * NR_OF_POSITIONS + 1
+
+
+class ObservationEncoder:
+
+    @staticmethod
+    def encode(game, player, out=None):
+        """
+        Return an observation of the game from the point of view of the given player as a float32 array. The
+        observation contains the following information per index:
+        0: Is it the given players' turn (0 = opponents' turn, 1 = current players' turn)
+        1: Remaining cards on the skipbo stack for given player
+        2: Remaining cards on the skipbo stack for opponent
+        3-29: Positions containing a skipbo card
+        30-56: Positions containing a 1 card
+        ...
+        327-353: Positions containing a 12 card
+        354: Remaining playable cards
+
+        The 27 positions per card are listed in visible_cards. When out is given the observation is written into it
+        (for example a row of a batch array) instead of into a newly allocated array.
+        """
+        if out is None:
+            out = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+        else:
+            out.fill(0)
+
+        other_player = 0 if player == 1 else 1
+
+        out[0] = 1 if game.current_player == player else 0
+        out[1] = game.get_remaining_skipbo_cards(player) / 30.0  # Normalized player skipbo cards
+        out[2] = game.get_remaining_skipbo_cards(other_player) / 30.0  # Normalized other player skipbo cards
+
+        cards = np.array(ObservationEncoder.visible_cards(game, player), dtype=np.intp)
+        positions = np.flatnonzero(cards != NO_CARD)
+        out[3 + cards[positions] * NR_OF_POSITIONS + positions] = 1
+
+        out[OBSERVATION_SIZE - 1] = game.nr_of_cards + game.nr_of_discarded / 92.0  # Normalized number of cards left
+
+        return out
+
+    @staticmethod
+    def visible_cards(game, player):
+        """
+        Return the card visible at each position (from the given players' point of view), reading every position once:
+        0: Skip-Bo stack
+        1-5: Hand cards
+        6-9: Top of the player stacks
+        10-13: Cards below the top of the player stacks
+        14-17: Center stacks (the value of the top card)
+        18: Skip-Bo stack of the opponent
+        19-22: Top of the player stacks of the opponent
+        23-26: Cards below the top of the player stacks of the opponent
+        """
+        other_player = 0 if player == 1 else 1
+
+        cards = [game.top_card(player, position) for position in range(10)]
+        cards.extend(game.card_below_top(player, index) for index in range(4))
+        cards.extend(game.center_stack_value(index) for index in range(4))
+        cards.append(game.top_card(other_player, 0))
+        cards.extend(game.top_card(other_player, 6 + index) for index in range(4))
+        cards.extend(game.card_below_top(other_player, index) for index in range(4))
+
+        return cards
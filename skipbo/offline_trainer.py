@@ -0,0 +1,134 @@
+"""
+Train a model on a dataset of state transitions, without playing games.
+
+Usage: python -m skipbo.offline_trainer datasets/games Offline [epochs]
+"""
+import os
+import queue
+import sys
+import threading
+
+import numpy as np
+
+from skipbo.checkpoint_manager import CheckpointManager
+from skipbo.memmap_replay_buffer import MemmapReplayBuffer
+from skipbo.model import ModelManager
+from skipbo.numpy_model import NumpyModel
+from skipbo.observation_encoder import OBSERVATION_SIZE
+from skipbo.skipbo_env import SkipboEnv
+
+
+class OfflineTrainer:
+    """
+    Trains a model with the Double DQN train step of DqnAgent on a stored dataset, like a MemmapReplayBuffer
+    written by dataset_export or by an agent with a persistent replay buffer. Every epoch visits all transitions
+    once in a shuffled order. A background thread gathers the next batches from the memory mapped arrays while the
+    current batch trains, so the data does not have to fit in memory and reading overlaps with training.
+    """
+
+    def __init__(self, model, replay_buffer, batch_size=256, discount_factor=0.995,
+                 target_network_replace_frequency_steps=1000, prefetch_batches=4, seed=None):
+        self.model = model
+        self.target_model = ModelManager.copy_model(model)
+        self.train_step = ModelManager.create_train_step(model, self.target_model, discount_factor)
+        self.update_target_model = ModelManager.create_target_model_update(model, self.target_model)
+        self.replay_buffer = replay_buffer
+        self.batch_size = batch_size
+        self.target_network_replace_frequency_steps = target_network_replace_frequency_steps
+        self.prefetch_batches = prefetch_batches
+        self.random = np.random.default_rng(seed)
+        self.step_count = 0
+
+    def batches(self, epoch_indices):
+        """
+        Yield the batches of an epoch, gathered by a background thread up to prefetch_batches batches ahead.
+        """
+        batches = queue.Queue(maxsize=self.prefetch_batches)
+        stop = threading.Event()
+
+        def put(batch):
+            # Gives up when the consumer stopped, instead of blocking on a full queue forever
+            while not stop.is_set():
+                try:
+                    batches.put(batch, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def gather():
+            for start in range(0, len(epoch_indices) - self.batch_size + 1, self.batch_size):
+                # Sorted indices read the memory mapped files front to back
+                indices = np.sort(epoch_indices[start:start + self.batch_size])
+                if not put(self.replay_buffer.get_transitions(indices)):
+                    return
+            # None marks the end of the epoch
+            put(None)
+
+        thread = threading.Thread(target=gather, daemon=True)
+        thread.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    return
+                yield batch
+        finally:
+            stop.set()
+            thread.join()
+
+    def train_epoch(self):
+        """
+        Train on every transition of the dataset once (the last incomplete batch is skipped) and return the mean
+        absolute TD error.
+        """
+        epoch_indices = self.random.permutation(self.replay_buffer.length())
+        weights = np.ones(self.batch_size, dtype=np.float32)
+        td_error_sum = 0.0
+        nr_of_batches = 0
+
+        for batch in self.batches(epoch_indices):
+            td_errors = self.train_step(
+                batch.old_states,
+                batch.actions,
+                batch.rewards,
+                batch.new_states,
+                batch.dones,
+                batch.allowed_action_masks,
+                weights)
+            td_error_sum += float(np.mean(np.abs(td_errors.numpy())))
+            nr_of_batches += 1
+
+            self.step_count += 1
+            if self.step_count % self.target_network_replace_frequency_steps == 0:
+                self.update_target_model()
+
+        return td_error_sum / max(nr_of_batches, 1)
+
+    def train(self, epochs, checkpoint_manager=None):
+        """
+        Train for a number of epochs. With a CheckpointManager a checkpoint is saved after every epoch.
+        """
+        for epoch in range(epochs):
+            mean_td_error = self.train_epoch()
+            print(f"Epoch {epoch + 1}/{epochs}: {self.step_count} steps, mean absolute TD error {mean_td_error:.4f}")
+            if checkpoint_manager is not None:
+                # There is no episode reward offline, a lower TD error scores higher
+                checkpoint_manager.save(
+                    self.step_count,
+                    NumpyModel.from_keras_model(self.model),
+                    ModelManager.get_optimizer_state(self.model),
+                    0.0,
+                    -mean_td_error)
+
+
+if __name__ == "__main__":
+    dataset = MemmapReplayBuffer.open(sys.argv[1])
+    name = sys.argv[2]
+    nr_of_epochs = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    offline_model = ModelManager.create_model(OBSERVATION_SIZE, SkipboEnv.action_size, 0.001, 0.001)
+    trainer = OfflineTrainer(offline_model, dataset)
+    manager = CheckpointManager(os.path.join("models", name))
+    trainer.train(nr_of_epochs, manager)
+    manager.close()
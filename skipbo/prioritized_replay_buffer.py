@@ -0,0 +1,48 @@
+import numpy as np
+
+from skipbo.replay_buffer import ReplayBuffer
+from skipbo.sum_tree import SumTree
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    Replay buffer that samples transitions with a probability proportional to priority ** alpha, where the
+    priority is the absolute TD error of the transition plus a small epsilon. New transitions get the highest
+    priority seen so far, so every transition is sampled at least once with high probability.
+
+    Batches include the sampled indices, to write back new TD errors with update_priorities, and importance
+    sampling weights that correct for the non uniform sampling. Beta is annealed towards 1 with every sample.
+    """
+
+    def __init__(self, size=10000, state_size=355, alpha=0.6, beta=0.4, beta_increment=0.00001, priority_epsilon=0.01):
+        super().__init__(size, state_size)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.priority_epsilon = priority_epsilon
+        self.max_priority = 1.0
+        self.sum_tree = SumTree(size)
+
+    def add(self, transition):
+        index = self.current_index
+        super().add(transition)
+        self.sum_tree.update([index], [self.max_priority ** self.alpha])
+
+    def get_batch(self, batch_size):
+        # Stratified sampling: one value from each of batch_size equally sized segments of the total priority
+        segment = self.sum_tree.total() / batch_size
+        values = (np.arange(batch_size) + self.random.random(batch_size)) * segment
+        indices = np.minimum(self.sum_tree.find(values), self.nr_of_transitions - 1)
+
+        probabilities = self.sum_tree.get(indices) / self.sum_tree.total()
+        weights = (self.nr_of_transitions * probabilities) ** -self.beta
+        self.beta = min(1.0, self.beta + self.beta_increment)
+
+        batch = self.get_transitions(indices)
+        batch.weights = (weights / weights.max()).astype(np.float32)
+        return batch
+
+    def update_priorities(self, indices, td_errors):
+        priorities = np.abs(td_errors) + self.priority_epsilon
+        self.max_priority = max(self.max_priority, priorities.max())
+        self.sum_tree.update(indices, priorities ** self.alpha)
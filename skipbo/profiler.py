@@ -0,0 +1,126 @@
+import cProfile
+import json
+import time
+from contextlib import nullcontext
+
+# Bucket b of a histogram counts the durations from 2 ** (b - 1) up to 2 ** b microseconds, bucket 0 those below 1
+HISTOGRAM_SIZE = 32
+DISABLED_PHASE = nullcontext()
+
+
+class PhaseTimer:
+    """
+    Context manager that adds the duration of its block to the counters and the log2 histogram of a phase.
+    """
+
+    def __init__(self):
+        self.start = 0
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = [0] * HISTOGRAM_SIZE
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        duration = time.perf_counter_ns() - self.start
+        self.count += 1
+        self.total_ns += duration
+        if duration > self.max_ns:
+            self.max_ns = duration
+        self.histogram[min((duration // 1000).bit_length(), HISTOGRAM_SIZE - 1)] += 1
+        return False
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_s": self.total_ns / 1e9,
+            "mean_us": self.total_ns / self.count / 1000 if self.count > 0 else 0.0,
+            "max_us": self.max_ns / 1000,
+            # Pairs of the upper bound of a bucket in microseconds and its count, for the buckets that are used
+            "histogram_us": [[2 ** bucket, count] for bucket, count in enumerate(self.histogram) if count > 0]
+        }
+
+
+class Profiler:
+    """
+    Switchable timing of the phases of the training loop, shared by SkipboEnv and DqnAgent. Code is timed with
+
+        with profiler.phase("observation"):
+            ...
+
+    When the profiler is disabled phase returns a shared no-op context manager, so the instrumentation costs one
+    method call. Every summary_frequency_episodes episodes the counters and histograms of all phases are appended as
+    one JSON line to log_file (or printed without one) and reset.
+
+    With profile_episodes set, cProfile runs for that many episodes starting at episode profile_start_episode and
+    its statistics are written to profile_file, which can be read with pstats or snakeviz.
+    """
+
+    def __init__(self, enabled=False, log_file=None, summary_frequency_episodes=100, profile_start_episode=0,
+                 profile_episodes=0, profile_file="profile.prof"):
+        self.enabled = enabled
+        self.log_file = log_file
+        self.summary_frequency_episodes = summary_frequency_episodes
+        self.profile_start_episode = profile_start_episode
+        self.profile_episodes = profile_episodes
+        self.profile_file = profile_file
+        self.profile = None
+        self.phases = {}
+        self.episode = 0
+        self.summary_start = time.perf_counter()
+        if self.profile_episodes > 0 and self.profile_start_episode == 0:
+            self.__start_profile()
+
+    def phase(self, name):
+        if not self.enabled:
+            return DISABLED_PHASE
+
+        timer = self.phases.get(name)
+        if timer is None:
+            timer = PhaseTimer()
+            self.phases[name] = timer
+        return timer
+
+    def episode_end(self):
+        """
+        Called by the environment after every episode, writes the periodic summary and starts or stops cProfile.
+        """
+        self.episode += 1
+        if self.profile_episodes > 0:
+            if self.episode == self.profile_start_episode:
+                self.__start_profile()
+            elif self.episode == self.profile_start_episode + self.profile_episodes:
+                self.__stop_profile()
+
+        if self.enabled and self.episode % self.summary_frequency_episodes == 0:
+            self.write_summary()
+
+    def summary(self):
+        return {
+            "episode": self.episode,
+            "time": time.time(),
+            "seconds": time.perf_counter() - self.summary_start,
+            "phases": {name: timer.summary() for name, timer in self.phases.items()}
+        }
+
+    def write_summary(self):
+        line = json.dumps(self.summary())
+        if self.log_file is None:
+            print(line)
+        else:
+            with open(self.log_file, "a") as file:
+                file.write(line + "\n")
+        self.phases = {}
+        self.summary_start = time.perf_counter()
+
+    def __start_profile(self):
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def __stop_profile(self):
+        self.profile.disable()
+        self.profile.dump_stats(self.profile_file)
+        self.profile = None
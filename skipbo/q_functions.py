@@ -1,31 +1,91 @@
 import random
+import weakref
 
 import numpy as np
 
 
 class QFunctions:
+    # Compiled prediction functions per model, see get_prediction_function
+    prediction_functions = weakref.WeakKeyDictionary()
 
     @staticmethod
-    def select_action_epsilon_greedy(q_values, epsilon, allowed_actions):
+    def select_action_epsilon_greedy(q_values, epsilon, action_mask):
         random_value = random.uniform(0, 1)
         if random_value < epsilon:
-            return random.choice(allowed_actions)
+            return int(random.choice(np.flatnonzero(action_mask)))
         else:
-            adjusted_q_values = [q_values[index] for index in allowed_actions]
-            selected_index_allowed_actions = np.argmax(adjusted_q_values)
-            return allowed_actions[selected_index_allowed_actions]
+            return QFunctions.select_best_action(q_values, action_mask)
 
     @staticmethod
-    def select_best_action(q_values, allowed_actions):
-        adjusted_q_values = [q_values[index] for index in allowed_actions]
-        selected_index_allowed_actions = np.argmax(adjusted_q_values)
-        return allowed_actions[selected_index_allowed_actions]
+    def select_actions_epsilon_greedy(q_values, epsilon, action_masks):
+        """
+        Batch version of select_action_epsilon_greedy for rows of Q-values and bool action masks: every row picks a
+        random allowed action with probability epsilon and the best allowed action otherwise.
+        """
+        explore = np.random.random(len(q_values)) < epsilon
+        scores = np.where(explore[:, np.newaxis], np.random.random(q_values.shape), q_values)
+        return np.argmax(np.where(action_masks, scores, -np.inf), axis=-1)
+
+    @staticmethod
+    def get_action_epsilon_greedy(model, state, epsilon, action_mask):
+        """
+        Return a random allowed action with probability epsilon and the best allowed action of the model otherwise.
+        The model is only called when the best action is needed.
+        """
+        if random.uniform(0, 1) < epsilon:
+            return int(random.choice(np.flatnonzero(action_mask)))
+        return QFunctions.get_best_action(model, state, action_mask)
+
+    @staticmethod
+    def select_best_action(q_values, action_mask):
+        return int(np.argmax(np.where(action_mask, q_values, -np.inf)))
+
+    @staticmethod
+    def get_best_action(model, state, action_mask):
+        """
+        Return the best allowed action of the model for a single state. The masked argmax runs in NumPy, for a single
+        row that is faster than running it in the compiled graph of the model.
+        """
+        return QFunctions.select_best_action(QFunctions.get_q_values(model, state), action_mask)
 
     @staticmethod
     def get_q_values(model, state):
-        model_input = np.asarray(state)[np.newaxis, ...]
-        return model.predict(model_input)[0]
+        model_input = np.asarray(state, dtype=np.float32)[np.newaxis, ...]
+        return QFunctions.get_multiple_q_values(model, model_input)[0]
 
     @staticmethod
     def get_multiple_q_values(model, states):
-        return model.predict(states)
+        if hasattr(model, "predict_q_values"):
+            # Models that are not Keras models, like NumpyModel
+            return model.predict_q_values(states)
+
+        predict = QFunctions.get_prediction_function(model)
+        return predict(np.asarray(states, dtype=np.float32)).numpy()
+
+    @staticmethod
+    def get_prediction_function(model):
+        """
+        Return a tf.function that calls the model directly on a batch of states and returns the Q-values. Unlike
+        model.predict it does not set up a data pipeline on every call, and the input signature lets single rows and
+        batches of any size share one traced graph.
+        """
+        predict = QFunctions.prediction_functions.get(model)
+        if predict is None:
+            predict = QFunctions.create_prediction_function(model)
+            QFunctions.prediction_functions[model] = predict
+
+        return predict
+
+    @staticmethod
+    def create_prediction_function(model):
+        import tensorflow as tf
+
+        # A weak reference, so the cached function does not keep the model alive
+        model_reference = weakref.ref(model)
+        states_signature = tf.TensorSpec(shape=(None,) + tuple(model.input_shape[1:]), dtype=tf.float32)
+
+        @tf.function(input_signature=[states_signature])
+        def q_values(states):
+            return model_reference()(states, training=False)
+
+        return q_values
@@ -0,0 +1,86 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from skipbo.q_functions import QFunctions
+
+
+class QValueCache:
+    """
+    LRU cache of Q-values in front of a model (a Keras model or a NumpyModel), keyed by the bytes of the encoded
+    observation. Within a turn the same observation is often reached by playing hand cards in a different order,
+    and search agents evaluate the same positions in many determinizations. The cache has a predict_q_values method,
+    so it can be passed to TrainedDqnAgent, MctsAgent or QFunctions wherever a model is expected.
+
+    The cache is cleared when the weights of the model change. NumpyModel counts its weight updates, for other
+    models the bias of the output layer is compared. invalidate clears the cache explicitly.
+    """
+
+    def __init__(self, model, size=100000):
+        self.model = model
+        self.size = size
+        self.entries = OrderedDict()
+        self.weights_version = self.__get_weights_version()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def predict_q_values(self, states):
+        states = np.asarray(states, dtype=np.float32)
+        version = self.__get_weights_version()
+        if not self.__same_version(version):
+            self.invalidate()
+            self.weights_version = version
+
+        keys = [state.tobytes() for state in states]
+        rows = [self.entries.get(key) for key in keys]
+        # Rows with the same observation in one batch are predicted once
+        missing = {}
+        for index, row in enumerate(rows):
+            if row is None:
+                missing.setdefault(keys[index], index)
+        self.hits += len(states) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            predicted = QFunctions.get_multiple_q_values(self.model, states[list(missing.values())])
+            for key, row in zip(missing, predicted):
+                self.entries[key] = row.copy()
+            rows = [self.entries[key] if row is None else row for key, row in zip(keys, rows)]
+
+        # Mark the rows as recently used, new rows are already at the end
+        for key in keys:
+            self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+        return np.stack(rows)
+
+    def invalidate(self):
+        self.entries.clear()
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def statistics(self):
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate()
+        }
+
+    def __same_version(self, version):
+        if isinstance(version, np.ndarray):
+            return np.array_equal(version, self.weights_version)
+        return version == self.weights_version
+
+    def __get_weights_version(self):
+        version = getattr(self.model, "weights_version", None)
+        if version is not None:
+            return version
+        # Keras models have no version, training and set_weights change the bias of the output layer though
+        return self.model.layers[-1].get_weights()[-1].copy()
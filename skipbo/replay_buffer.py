@@ -1,27 +1,65 @@
-import random
+import numpy as np
+
+from skipbo.action_mask import PACKED_ACTION_MASK_SIZE, ActionMask
+from skipbo.state_transition import StateTransitionBatch
 
 
 class ReplayBuffer:
-    current_index = 0
+    """
+    Ring buffer of state transitions, stored column wise in preallocated arrays. The allowed actions of the new
+    states are stored as packed 80 bit masks.
+    """
 
-    def __init__(self, size=10000):
+    def __init__(self, size=10000, state_size=355):
         self.size = size
-        self.transitions = []
+        self.current_index = 0
+        self.nr_of_transitions = 0
+        self.random = np.random.default_rng()
+        self.old_states = self.create_array("old_states", (size, state_size), np.float32)
+        self.allowed_action_masks = self.create_array("allowed_action_masks", (size, PACKED_ACTION_MASK_SIZE), np.uint8)
+        self.actions = self.create_array("actions", (size,), np.int32)
+        self.rewards = self.create_array("rewards", (size,), np.float32)
+        self.new_states = self.create_array("new_states", (size, state_size), np.float32)
+        self.dones = self.create_array("dones", (size,), bool)
+
+    def create_array(self, name, shape, dtype):
+        return np.zeros(shape, dtype=dtype)
 
     def add(self, transition):
-        if len(self.transitions) < self.size:
-            self.transitions.append(transition)
-        else:
-            self.transitions[self.current_index] = transition
-            self.__increment_current_index()
+        index = self.current_index
+        self.old_states[index] = transition.old_state
+        self.allowed_action_masks[index] = ActionMask.pack_array(ActionMask.from_actions(transition.allowed_actions))
+        self.actions[index] = transition.action
+        self.rewards[index] = transition.reward
+        self.new_states[index] = transition.new_state
+        self.dones[index] = transition.done
+
+        self.nr_of_transitions = min(self.nr_of_transitions + 1, self.size)
+        self.__increment_current_index()
 
     def length(self):
-        return len(self.transitions)
+        return self.nr_of_transitions
+
+    def flush(self):
+        """
+        Write the buffer to its storage. Only has effect for buffers that are backed by files.
+        """
 
     def get_batch(self, batch_size):
-        return random.sample(self.transitions, batch_size)
+        indices = self.random.choice(self.nr_of_transitions, size=batch_size, replace=False)
+        return self.get_transitions(indices)
+
+    def get_transitions(self, indices):
+        return StateTransitionBatch(
+            self.old_states[indices],
+            ActionMask.unpack(self.allowed_action_masks[indices]),
+            self.actions[indices],
+            self.rewards[indices],
+            self.new_states[indices],
+            self.dones[indices],
+            indices)
 
     def __increment_current_index(self):
         self.current_index += 1
-        if self.current_index >= self.size - 1:
+        if self.current_index >= self.size:
             self.current_index = 0
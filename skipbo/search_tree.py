@@ -0,0 +1,118 @@
+import numpy as np
+
+
+class SearchTree:
+    """
+    Node pool of a search tree over the moves within one turn, used by MctsAgent. Nodes are indices into arrays that
+    are allocated once, so adding a node only stores the snapshot of its game. Node 0 is the root.
+
+    Every allowed edge has an estimate: the Q-value of the network until the edge is explored, afterwards the reward
+    of the move plus the discounted value of the child. The value of a node is the best estimate of its edges. Only
+    moves to a center stack lead to children, a move to a player stack ends the turn and keeps its Q-value. Open edges
+    lead to a part of the tree that can still be searched, a node without open edges is exhausted.
+    """
+
+    def __init__(self, capacity, action_size, discount_factor):
+        self.capacity = capacity
+        self.discount_factor = discount_factor
+        # Moves to a center stack keep the turn going
+        self.continuing_actions = np.arange(action_size) % 8 < 4
+        self.parents = np.zeros(capacity, dtype=np.int32)
+        self.parent_actions = np.zeros(capacity, dtype=np.int32)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.values = np.zeros(capacity, dtype=np.float32)
+        self.visits = np.zeros(capacity, dtype=np.int32)
+        self.exhausted = np.zeros(capacity, dtype=bool)
+        self.children = np.zeros((capacity, action_size), dtype=np.int32)
+        self.edge_values = np.zeros((capacity, action_size), dtype=np.float32)
+        self.edge_visits = np.zeros((capacity, action_size), dtype=np.int32)
+        self.open_edges = np.zeros((capacity, action_size), dtype=bool)
+        self.snapshots = [None] * capacity
+        self.nr_of_nodes = 0
+
+    def reset(self):
+        self.snapshots[:self.nr_of_nodes] = [None] * self.nr_of_nodes
+        self.nr_of_nodes = 0
+
+    def is_full(self):
+        return self.nr_of_nodes == self.capacity
+
+    def add_node(self, parent, action, reward, snapshot):
+        """
+        Add a node that is not expanded yet and return its index. The edge from the parent is closed until the node
+        is expanded, so a batch of leaves never contains the same node twice.
+        """
+        node = self.nr_of_nodes
+        self.nr_of_nodes += 1
+        self.parents[node] = parent
+        self.parent_actions[node] = action
+        self.rewards[node] = reward
+        self.values[node] = 0
+        self.visits[node] = 0
+        self.exhausted[node] = False
+        self.children[node] = -1
+        self.edge_visits[node] = 0
+        self.open_edges[node] = False
+        self.snapshots[node] = snapshot
+
+        if parent >= 0:
+            self.children[parent, action] = node
+            self.open_edges[parent, action] = False
+        return node
+
+    def expand(self, node, q_values, action_mask):
+        """
+        Set the estimates of the edges of a node from the Q-values of its state and reopen the edge to it.
+        """
+        self.edge_values[node] = np.where(action_mask, q_values, -np.inf)
+        self.open_edges[node] = action_mask & self.continuing_actions
+        self.values[node] = self.edge_values[node].max()
+        self.__reopen(node)
+
+    def expand_terminal(self, node):
+        """
+        Mark a node in which the game is finished. Its value is only the reward of the move leading to it.
+        """
+        self.edge_values[node] = -np.inf
+        self.values[node] = 0
+        self.exhausted[node] = True
+
+    def select_edge(self, node, exploration):
+        """
+        Return the open edge of a node with the highest upper confidence bound, or -1 if there is none.
+        """
+        scores = self.edge_values[node] + exploration * np.sqrt(
+            np.log(self.visits[node] + 1) / (self.edge_visits[node] + 1))
+        scores[~self.open_edges[node]] = -np.inf
+        action = int(np.argmax(scores))
+        if not self.open_edges[node, action]:
+            return -1
+        return action
+
+    def visit(self, node, action):
+        self.visits[node] += 1
+        self.edge_visits[node, action] += 1
+
+    def backup(self, node):
+        """
+        Propagate the value of a node to the root. A parent of an exhausted node loses the open edge to it and is
+        exhausted itself when it has no other open edges.
+        """
+        while node != 0:
+            parent = self.parents[node]
+            action = self.parent_actions[node]
+            self.edge_values[parent, action] = self.rewards[node] + self.discount_factor * self.values[node]
+            self.values[parent] = self.edge_values[parent].max()
+            if self.exhausted[node]:
+                self.open_edges[parent, action] = False
+                self.exhausted[parent] = not self.open_edges[parent].any()
+            node = parent
+
+    def __reopen(self, node):
+        if node == 0:
+            self.exhausted[node] = not self.open_edges[node].any()
+            return
+        if self.open_edges[node].any():
+            self.open_edges[self.parents[node], self.parent_actions[node]] = True
+        else:
+            self.exhausted[node] = True
@@ -1,88 +1,165 @@
-from skipbo.game.skipbo_game import SkipBoGame
+import random
+
+from skipbo.action_mask import ActionMask
+from skipbo.game.skipbo_game import NR_OF_ACTIONS, SkipBoGame, actions_from_mask
 from skipbo.multi_agent_env import MultiAgentEnv
+from skipbo.observation_encoder import OBSERVATION_SIZE, ObservationEncoder
+from skipbo.profiler import Profiler
 
 
 class SkipboEnv(MultiAgentEnv):
+    observation_size = OBSERVATION_SIZE
+    action_size = NR_OF_ACTIONS
 
-    def __init__(self):
+    def __init__(self, profiler=None, logger=None, recorder=None):
+        """
+        The optional profiler times the phases of play, it can be shared with the agents. With a MetricsLogger the
+        results of every game are logged instead of printed. With a GameRecorder every game is recorded, games
+        without a seed in the options get a random seed so they can be replayed.
+        """
         super().__init__()
         self.game = None
         self.done = False
+        self.profiler = Profiler() if profiler is None else profiler
+        self.logger = logger
+        self.recorder = recorder
 
-    def reset(self):
+    def reset(self, seed=None):
         """
-        Creates a new Skip-Bo game for two players and returns the observed states and available actions per player
+        Creates a new Skip-Bo game for two players and returns the observed states and available actions per player.
+        Games created with the same seed deal the same cards.
         """
-        self.game = SkipBoGame()
+        self.game = SkipBoGame(seed)
         self.done = False
         observation = self.__get_observation(self.game, self.game.current_player)
         available_actions = self.__get_available_actions(self.game, self.game.current_player)
         return observation, available_actions
 
     def play(self, agents, options):
-        observation, available_actions = self.reset()
+        """
+        Play a game and return the winning player, or None when the cards ran out. Next to the episode number the
+        options can contain a seed for the game and verbose (default True) to print the result.
+        """
+        profiler = self.profiler
+        seed = options.get("seed")
+        if self.recorder is not None and seed is None:
+            seed = random.getrandbits(64)
+        observation, available_actions = self.reset(seed)
+        actions = []
         accumulated_rewards = [0, 0]
+        episode_rewards = [0, 0]
 
         while not self.done:
             player = self.game.current_player
             agent = agents[player]
-            action = agent.action(observation, available_actions, accumulated_rewards[player], None)
+            extra = {
+                "action_mask": ActionMask.to_array(self.game.get_available_action_mask(player)),
+                # Agents that search (like MctsAgent) work on a copy of the game
+                "game": self.game
+            }
+            with profiler.phase("agent_action"):
+                action = agent.action(observation, available_actions, accumulated_rewards[player], extra)
 
             # Reset accumulated rewards for current player
             accumulated_rewards[player] = 0
 
-            game_action = self.convert_action_from_rl_notation(action)
-
             # self.game.visualize()
             # print(f"Available actions {list(map(lambda x: self.convert_action_from_rl_notation(x), available_actions))}.")
-            # print(f"Action taken {game_action}, by player {self.game.current_player}")
+            # print(f"Action taken {self.convert_action_from_rl_notation(action)}, by player {self.game.current_player}")
             # print(f"Cards in game: {self.game.cards_in_game()}")
 
-            prev_remaining_skipbo_cards = [self.game.get_remaining_skipbo_cards(0),
-                                           self.game.get_remaining_skipbo_cards(1)]
-            could_draw_cards = self.game.play_card(game_action[0], game_action[1])
-            remaining_skipbo_cards = [self.game.get_remaining_skipbo_cards(0), self.game.get_remaining_skipbo_cards(1)]
+            with profiler.phase("play_action"):
+                rewards, self.done = self.play_action(self.game, action)
+            accumulated_rewards[0] += rewards[0]
+            accumulated_rewards[1] += rewards[1]
+            episode_rewards[0] += rewards[0]
+            episode_rewards[1] += rewards[1]
+            actions.append(action)
 
             # observation for the new player
-            observation = self.__get_observation(self.game, self.game.current_player)
-
-            # small penalty for finishing the turn by putting a card on player stacks
-            if game_action[1] >= 4:
-                accumulated_rewards[player] -= 0.05
-
-            # points for playing skipbo cards
-            accumulated_rewards[0] += prev_remaining_skipbo_cards[0] - remaining_skipbo_cards[0]
-            accumulated_rewards[1] += prev_remaining_skipbo_cards[1] - remaining_skipbo_cards[1]
+            with profiler.phase("observation"):
+                observation = self.__get_observation(self.game, self.game.current_player)
 
             available_actions = []
-            if remaining_skipbo_cards[0] == 0:
-                accumulated_rewards[0] += 10
-                accumulated_rewards[1] -= 10
-                self.done = True
-                agents[0].done(observation, accumulated_rewards[0])
-                agents[1].done(observation, accumulated_rewards[1])
-                print(f"Game {options['episode']} finished. {agents[0].name}: {self.game.get_remaining_skipbo_cards(0)}, {agents[1].name}: {self.game.get_remaining_skipbo_cards(1)}")
-            elif remaining_skipbo_cards[1] == 0:
-                accumulated_rewards[0] -= 10
-                accumulated_rewards[1] += 10
-                self.done = True
-                agents[0].done(observation, accumulated_rewards[0])
-                agents[1].done(observation, accumulated_rewards[1])
-                print(f"Game {options['episode']} finished. {agents[0].name}: {self.game.get_remaining_skipbo_cards(0)}, {agents[1].name}: {self.game.get_remaining_skipbo_cards(1)}")
-            elif could_draw_cards:
-                # Available actions for the new player
-                available_actions = self.__get_available_actions(self.game, self.game.current_player)
+            if self.done:
+                # The epsilon the agents explored with in this game, before it decays in done
+                epsilons = [getattr(agent, "current_epsilon", None) for agent in agents]
+                with profiler.phase("agent_done"):
+                    agents[0].done(observation, accumulated_rewards[0])
+                    agents[1].done(observation, accumulated_rewards[1])
+                if self.logger is not None:
+                    self.logger.log_episode(
+                        options["episode"],
+                        [agents[0].name, agents[1].name],
+                        episode_rewards,
+                        len(actions),
+                        [self.game.get_remaining_skipbo_cards(0), self.game.get_remaining_skipbo_cards(1)],
+                        epsilons,
+                        [getattr(agent, "steps_per_second", None) for agent in agents],
+                        [getattr(agent, "updates_per_second", None) for agent in agents])
+                elif options.get("verbose", True):
+                    print(f"Game {options['episode']} finished. {agents[0].name}: {self.game.get_remaining_skipbo_cards(0)}, {agents[1].name}: {self.game.get_remaining_skipbo_cards(1)}")
             else:
-                # Game finished because there are no more drawable cards
-                self.done = True
-                accumulated_rewards[0] -= 10
-                accumulated_rewards[1] -= 10
-                agents[0].done(observation, accumulated_rewards[0])
-                agents[1].done(observation, accumulated_rewards[1])
-                print(f"Game {options['episode']} finished. {agents[0].name}: {self.game.get_remaining_skipbo_cards(0)}, {agents[1].name}: {self.game.get_remaining_skipbo_cards(1)}")
+                # Available actions for the new player
+                with profiler.phase("available_actions"):
+                    available_actions = self.__get_available_actions(self.game, self.game.current_player)
+
+        if self.recorder is not None:
+            self.recorder.record(seed, actions)
+        profiler.episode_end()
+        return self.winner()
+
+    def winner(self):
+        """
+        Return the player that won the finished game, or None when nobody played all Skip-Bo cards.
+        """
+        for player in range(2):
+            if self.game.get_remaining_skipbo_cards(player) == 0:
+                return player
+        return None
+
+    @staticmethod
+    def play_action(game, action):
+        """
+        Play an action (in rl notation) for the current player of the game. Returns the rewards for both players
+        and whether the game is finished.
+        """
+        player = game.current_player
+        play_from, play_to = divmod(action, 8)
+
+        prev_remaining_skipbo_cards = [game.get_remaining_skipbo_cards(0), game.get_remaining_skipbo_cards(1)]
+        could_draw_cards = game.play_card(play_from, play_to)
+        remaining_skipbo_cards = [game.get_remaining_skipbo_cards(0), game.get_remaining_skipbo_cards(1)]
+
+        rewards = [0, 0]
+
+        # small penalty for finishing the turn by putting a card on player stacks
+        if play_to >= 4:
+            rewards[player] -= 0.05
+
+        # points for playing skipbo cards
+        rewards[0] += prev_remaining_skipbo_cards[0] - remaining_skipbo_cards[0]
+        rewards[1] += prev_remaining_skipbo_cards[1] - remaining_skipbo_cards[1]
+
+        if remaining_skipbo_cards[0] == 0:
+            rewards[0] += 10
+            rewards[1] -= 10
+            return rewards, True
+        elif remaining_skipbo_cards[1] == 0:
+            rewards[0] -= 10
+            rewards[1] += 10
+            return rewards, True
+        elif not could_draw_cards:
+            # Game finished because there are no more drawable cards
+            rewards[0] -= 10
+            rewards[1] -= 10
+            return rewards, True
+        else:
+            return rewards, False
 
     def __get_available_actions(self, game, player):
-        return [self.convert_action_to_rl_notation(x) for x in game.get_available_actions(player)]
+        # The bits of the action mask are already in rl notation
+        return actions_from_mask(game.get_available_action_mask(player))
 
     def convert_action_to_rl_notation(self, game_action):
         return 8 * game_action[0] + game_action[1]
@@ -93,103 +170,4 @@ class SkipboEnv(MultiAgentEnv):
         return play_from, play_to
 
     def __get_observation(self, game, player):
-        """
-        Return an observation. The observation is an array containing the following information per index:
-        0: Is it the given players' turn (0 = opponents' turn, 1 = current players' turn)
-        1: Remaining cards on the skipbo stack for given player
-        2: Remaining cards on the skipbo stack for opponent
-        3-21: Positions containing a skipbo card
-        22-40: Positions containing a 1 card
-        41-59: Positions containing a 2 card
-        60-78: Positions containing a 3 card
-        79-97: Positions containing a 4 card
-        98-116: Positions containing a 5 card
-        117-135: Positions containing a 6 card
-        136-154: Positions containing a 7 card
-        155-173: Positions containing a 8 card
-        174-192: Positions containing a 9 card
-        192-211: Positions containing a 10 card
-        212-230: Positions containing a 11 card
-        231-249: Positions containing a 12 card
-        250: Remaining playable cards
-        """
-        other_player = 0 if player == 1 else 1
-
-        observation = []
-        observation.append(1 if game.current_player == player else 0)
-        observation.append(len(game.player_skipbo_stacks[player]) / 30.0)  # Normalized player skipbo cards
-        observation.append(len(game.player_skipbo_stacks[other_player]) / 30.0)  # Normalized other player skipbo cards
-        for i in range(13):
-            observation.extend(self.__get_array_of_positions_containing_card(player, i, game))
-        observation.append(len(self.game.cards) + len(self.game.discarded) / 92.0)  # Normalized number of cards left
-
-        return observation
-
-    def __get_top_card_from_stack(self, stack):
-        if len(stack) == 0:
-            return None
-        else:
-            return stack[0]
-
-    def __card_value(self, card, center):
-        if card is None:
-            return -1
-        else:
-            if center:
-                return card.actual_value
-            else:
-                return card.card_type
-
-    def __get_array_of_positions_containing_card(self, current_player, card, game):
-        """
-        Return an array containing all the positions (from the given players' point of view) that contain the given card.
-        """
-        other_player = 0 if game.current_player == 1 else 1
-        result = []
-
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_skipbo_stacks[current_player]), False) == card else 0)
-
-        result.append(1 if self.__card_value(game.player_hands[current_player][0], False) == card else 0)
-        result.append(1 if self.__card_value(game.player_hands[current_player][1], False) == card else 0)
-        result.append(1 if self.__card_value(game.player_hands[current_player][2], False) == card else 0)
-        result.append(1 if self.__card_value(game.player_hands[current_player][3], False) == card else 0)
-        result.append(1 if self.__card_value(game.player_hands[current_player][4], False) == card else 0)
-
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[current_player][0]), False) == card else 0)
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[current_player][1]), False) == card else 0)
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[current_player][2]), False) == card else 0)
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[current_player][3]), False) == card else 0)
-
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[current_player][0][1:]), False) == card else 0)
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[current_player][1][1:]), False) == card else 0)
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[current_player][2][1:]), False) == card else 0)
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[current_player][3][1:]), False) == card else 0)
-
-        # result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[current_player][0][2:]), False) == card else 0)
-        # result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[current_player][1][2:]), False) == card else 0)
-        # result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[current_player][2][2:]), False) == card else 0)
-        # result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[current_player][3][2:]), False) == card else 0)
-
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.center_stacks[0]), True) == card else 0)
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.center_stacks[1]), True) == card else 0)
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.center_stacks[2]), True) == card else 0)
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.center_stacks[3]), True) == card else 0)
-
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_skipbo_stacks[other_player]), False) == card else 0)
-
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[other_player][0]), False) == card else 0)
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[other_player][1]), False) == card else 0)
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[other_player][2]), False) == card else 0)
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[other_player][3]), False) == card else 0)
-
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[other_player][0][1:]), False) == card else 0)
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[other_player][1][1:]), False) == card else 0)
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[other_player][2][1:]), False) == card else 0)
-        result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[other_player][3][1:]), False) == card else 0)
-
-        # result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[other_player][0][2:]), False) == card else 0)
-        # result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[other_player][1][2:]), False) == card else 0)
-        # result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[other_player][2][2:]), False) == card else 0)
-        # result.append(1 if self.__card_value(self.__get_top_card_from_stack(game.player_stacks[other_player][3][2:]), False) == card else 0)
-
-        return result
+        return ObservationEncoder.encode(game, player)
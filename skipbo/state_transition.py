@@ -7,3 +7,24 @@ class StateTransition:
         self.reward = reward
         self.new_state = new_state
         self.done = done
+
+
+class StateTransitionBatch:
+    """
+    A batch of state transitions stored as arrays, with one row per transition. The allowed actions of the new
+    states are given as a bool mask of shape (batch size, actions). Indices are the positions of the transitions in
+    the replay buffer and weights are optional importance sampling weights per transition.
+    """
+
+    def __init__(self, old_states, allowed_action_masks, actions, rewards, new_states, dones, indices=None, weights=None):
+        self.old_states = old_states
+        self.allowed_action_masks = allowed_action_masks
+        self.actions = actions
+        self.rewards = rewards
+        self.new_states = new_states
+        self.dones = dones
+        self.indices = indices
+        self.weights = weights
+
+    def length(self):
+        return len(self.actions)
@@ -0,0 +1,43 @@
+import numpy as np
+
+
+class SumTree:
+    """
+    Binary segment tree in which every node holds the sum of the priorities of its children. Node 1 is the root,
+    node i has the children 2i and 2i + 1 and the priority of index i is stored in leaf capacity + i. The capacity is
+    rounded up to a power of two so all leaves are at the same depth. Updates and lookups are O(log n) and work on
+    arrays of indices at once.
+    """
+
+    def __init__(self, size):
+        self.capacity = 1
+        while self.capacity < size:
+            self.capacity *= 2
+        self.tree = np.zeros(2 * self.capacity, dtype=np.float64)
+
+    def total(self):
+        return self.tree[1]
+
+    def get(self, indices):
+        return self.tree[np.asarray(indices) + self.capacity]
+
+    def update(self, indices, priorities):
+        nodes = np.asarray(indices) + self.capacity
+        self.tree[nodes] = priorities
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            nodes = np.unique(nodes // 2)
+
+    def find(self, values):
+        """
+        Return for every value the index whose priority interval [prefix sum, prefix sum + priority) contains it.
+        """
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        while nodes[0] < self.capacity:
+            left_sums = self.tree[2 * nodes]
+            go_right = values >= left_sums
+            values -= left_sums * go_right
+            nodes = 2 * nodes + go_right
+        return nodes - self.capacity
@@ -0,0 +1,284 @@
+"""
+Evaluate checkpoints against each other and rate them with Elo.
+
+Usage: python -m skipbo.tournament [--mode round-robin|gauntlet] [--challenger Emily/56000] [--games 400]
+                                   [--workers 4] [--pattern "models/*/*.npz"]
+"""
+import argparse
+import glob
+import json
+import math
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from statistics import NormalDist
+
+from skipbo.action_mask import ActionMask
+from skipbo.agent import Agent
+from skipbo.numpy_model import NumpyModel
+from skipbo.q_functions import QFunctions
+from skipbo.skipbo_env import SkipboEnv
+
+# z value of a 95% confidence interval
+CONFIDENCE_Z = 1.96
+# Chance that a match between equal checkpoints stops with a winner, over all looks at the results together
+FALSE_POSITIVE_RATE = 0.05
+
+# Models loaded in a worker process, by checkpoint file
+loaded_models = {}
+
+
+class GreedyAgent(Agent):
+    """
+    Agent that plays the best allowed action of its model, without printing or keeping rewards.
+    """
+
+    def __init__(self, name, model):
+        super().__init__()
+        self.name = name
+        self.model = model
+
+    def action(self, observation, allowed_actions, reward, extra):
+        action_mask = ActionMask.from_agent_arguments(allowed_actions, extra)
+        return QFunctions.get_best_action(self.model, observation, action_mask)
+
+    def done(self, final_observation, reward):
+        pass
+
+
+def load_checkpoint(file):
+    """
+    Load a checkpoint as a NumpyModel. Checkpoints saved by Keras (.h5) are converted, which needs TensorFlow.
+    """
+    model = loaded_models.get(file)
+    if model is None:
+        if file.endswith(".npz"):
+            model = NumpyModel.load(file)
+        else:
+            from tensorflow.keras.models import load_model
+            model = NumpyModel.from_keras_model(load_model(file, compile=False))
+        loaded_models[file] = model
+    return model
+
+
+def play_games(file_a, file_b, seeds):
+    """
+    Play one pair of games per seed, with the same deal and swapped seats, and return the wins of a, the wins of b
+    and the draws. Runs in a worker process.
+    """
+    agent_a = GreedyAgent("a", load_checkpoint(file_a))
+    agent_b = GreedyAgent("b", load_checkpoint(file_b))
+    environment = SkipboEnv()
+    results = [0, 0, 0]
+    for seed in seeds:
+        for agents in ([agent_a, agent_b], [agent_b, agent_a]):
+            winner = environment.play(agents, {"episode": seed, "seed": seed, "verbose": False})
+            if winner is None:
+                results[2] += 1
+            elif agents[winner] is agent_a:
+                results[0] += 1
+            else:
+                results[1] += 1
+    return results
+
+
+class Tournament:
+    """
+    Plays matches between checkpoints in a pool of processes. A match is played in blocks of paired games: every
+    seed deals the same cards twice with the seats swapped, which cancels most of the luck of the deal. A match stops
+    when the confidence interval of the score excludes 0.5, or after max_games games.
+
+    Completed matches are stored in cache_file, keyed by the checkpoint names, the modification times of their files,
+    the seed and the stopping parameters, so a rerun only plays the new matches. Ratings are Elo ratings fitted on all
+    results (Bradley-Terry).
+    """
+
+    def __init__(self, checkpoints, max_games=400, min_games=40, games_per_block=20, workers=None, seed=0,
+                 cache_file="models/tournament.json"):
+        """
+        checkpoints maps names (like "Emily/56000") to checkpoint files.
+        """
+        self.checkpoints = checkpoints
+        self.max_games = max_games
+        self.min_games = min_games
+        self.games_per_block = games_per_block
+        self.pairs_per_block = max(games_per_block // 2, 1)
+        self.stopping_z = self.sequential_z(max_games, min_games, 2 * self.pairs_per_block)
+        self.workers = workers or os.cpu_count()
+        self.seed = seed
+        self.cache_file = cache_file
+        self.results = self.__load_cache()
+
+    @staticmethod
+    def find_checkpoints(pattern="models/*/*.npz"):
+        """
+        Return the checkpoint files matching the pattern by name, the directory of the agent and the file name
+        without extension.
+        """
+        checkpoints = {}
+        for file in sorted(glob.glob(pattern)):
+            name = os.path.splitext(os.path.relpath(file, os.path.dirname(os.path.dirname(file))))[0]
+            checkpoints[name.replace(os.sep, "/")] = file
+        return checkpoints
+
+    @staticmethod
+    def round_robin(names):
+        return [(a, b) for index, a in enumerate(names) for b in names[index + 1:]]
+
+    @staticmethod
+    def gauntlet(challenger, names):
+        return [(challenger, name) for name in names if name != challenger]
+
+    @staticmethod
+    def wilson_interval(score, games, z=CONFIDENCE_Z):
+        """
+        Return the Wilson score interval of a win rate, counting draws as half a win.
+        """
+        if games == 0:
+            return 0.0, 1.0
+        rate = score / games
+        denominator = 1 + z * z / games
+        center = (rate + z * z / (2 * games)) / denominator
+        margin = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / denominator
+        return center - margin, center + margin
+
+    @staticmethod
+    def sequential_z(max_games, min_games, games_per_block, false_positive_rate=FALSE_POSITIVE_RATE):
+        """
+        Return the z value of the interval that stops a match. The interval is tested after every block from
+        min_games on, and every test is another chance to stop on luck, so the false positive rate is divided over
+        the number of tests (a Bonferroni correction). This widens z from 1.96 for a single test to 3.0 for the
+        19 tests of the defaults (40 to 400 games in blocks of 20).
+        """
+        nr_of_looks = max(math.ceil((max_games - max(min_games, games_per_block)) / games_per_block) + 1, 1)
+        return NormalDist().inv_cdf(1 - false_positive_rate / (2 * nr_of_looks))
+
+    def run(self, pairings):
+        """
+        Play all pairings that are not cached and return the results of all pairings as a dict from (a, b) to
+        [wins of a, wins of b, draws].
+        """
+        matches = {pairing: [0, 0, 0] for pairing in pairings if self.__cache_key(pairing) not in self.results}
+        submitted_blocks = {pairing: 0 for pairing in matches}
+        running_blocks = {pairing: 0 for pairing in matches}
+        # Use all workers when there are fewer matches than workers
+        blocks_per_match = max(self.workers // max(len(matches), 1), 1)
+        running = {}
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(self.workers, mp_context=context) as executor:
+            while True:
+                for pairing, results in matches.items():
+                    while running_blocks[pairing] < blocks_per_match and \
+                            self.__needs_games(results, submitted_blocks[pairing]):
+                        running[self.__submit(executor, pairing, submitted_blocks[pairing])] = pairing
+                        submitted_blocks[pairing] += 1
+                        running_blocks[pairing] += 1
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    pairing = running.pop(future)
+                    running_blocks[pairing] -= 1
+                    results = matches[pairing]
+                    for index, count in enumerate(future.result()):
+                        results[index] += count
+                    if running_blocks[pairing] == 0 and not self.__needs_games(results, submitted_blocks[pairing]):
+                        self.__store(pairing, results)
+
+        return {pairing: self.results[self.__cache_key(pairing)]["results"] for pairing in pairings}
+
+    @staticmethod
+    def ratings(results, iterations=1000):
+        """
+        Return Elo ratings (with a mean of 1500) fitted on the results of all pairings. Every pairing counts one
+        extra draw, so players without wins or losses still get a finite rating.
+        """
+        names = sorted({name for pairing in results for name in pairing})
+        scores = {name: 0.0 for name in names}
+        games = {}
+        for (a, b), (wins_a, wins_b, draws) in results.items():
+            scores[a] += wins_a + 0.5 * draws + 0.5
+            scores[b] += wins_b + 0.5 * draws + 0.5
+            games[(a, b)] = wins_a + wins_b + draws + 1
+
+        strengths = {name: 1.0 for name in names}
+        for _ in range(iterations):
+            for name in names:
+                denominator = sum(count / (strengths[a] + strengths[b])
+                                  for (a, b), count in games.items() if name in (a, b))
+                strengths[name] = scores[name] / denominator
+
+        elos = {name: 400 * math.log10(strength) for name, strength in strengths.items()}
+        mean = sum(elos.values()) / len(elos) if elos else 0
+        return {name: 1500 + elo - mean for name, elo in elos.items()}
+
+    def __needs_games(self, results, blocks):
+        """
+        Return whether another block of games is needed for a match with the given results and submitted blocks.
+        """
+        games = sum(results)
+        if blocks * self.pairs_per_block * 2 >= self.max_games:
+            return False
+        if games < self.min_games:
+            return True
+        low, high = self.wilson_interval(results[0] + 0.5 * results[2], games, self.stopping_z)
+        return low <= 0.5 <= high
+
+    def __submit(self, executor, pairing, block):
+        a, b = pairing
+        start = self.seed + block * self.pairs_per_block
+        seeds = list(range(start, start + self.pairs_per_block))
+        return executor.submit(play_games, self.checkpoints[a], self.checkpoints[b], seeds)
+
+    def __cache_key(self, pairing):
+        a, b = pairing
+        return f"{a}@{os.path.getmtime(self.checkpoints[a])} vs {b}@{os.path.getmtime(self.checkpoints[b])} " \
+               f"seed {self.seed} games {self.min_games}-{self.max_games} per {self.games_per_block}"
+
+    def __load_cache(self):
+        if self.cache_file is None or not os.path.exists(self.cache_file):
+            return {}
+        with open(self.cache_file) as file:
+            return json.load(file)
+
+    def __store(self, pairing, results):
+        self.results[self.__cache_key(pairing)] = {"results": results}
+        if self.cache_file is None:
+            return
+        directory = os.path.dirname(self.cache_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_file = self.cache_file + ".tmp"
+        with open(temporary_file, "w") as file:
+            json.dump(self.results, file, indent=2)
+        os.replace(temporary_file, self.cache_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Skip-Bo checkpoint tournament")
+    parser.add_argument("--mode", choices=["round-robin", "gauntlet"], default="round-robin")
+    parser.add_argument("--challenger", help="checkpoint that plays every other checkpoint in gauntlet mode")
+    parser.add_argument("--pattern", default="models/*/*.npz")
+    parser.add_argument("--games", type=int, default=400, help="maximum number of games per match")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    tournament = Tournament(Tournament.find_checkpoints(arguments.pattern), arguments.games,
+                            workers=arguments.workers, seed=arguments.seed)
+    names = list(tournament.checkpoints)
+    if arguments.mode == "gauntlet":
+        pairings = Tournament.gauntlet(arguments.challenger or names[-1], names)
+    else:
+        pairings = Tournament.round_robin(names)
+
+    all_results = tournament.run(pairings)
+    for (a, b), (wins_a, wins_b, draws) in all_results.items():
+        games = wins_a + wins_b + draws
+        low, high = Tournament.wilson_interval(wins_a + 0.5 * draws, games)
+        print(f"{a} vs {b}: {wins_a}-{wins_b}-{draws} in {games} games, "
+              f"score {(wins_a + 0.5 * draws) / max(games, 1):.3f} [{low:.3f}, {high:.3f}]")
+    for name, elo in sorted(tournament.ratings(all_results).items(), key=lambda item: -item[1]):
+        print(f"{elo:7.1f} {name}")
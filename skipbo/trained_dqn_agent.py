@@ -1,19 +1,14 @@
-import os
-
-import numpy as np
-from tensorflow.python.keras import Sequential
-
+from skipbo.action_mask import ActionMask
 from skipbo.agent import Agent
-from skipbo.dqn_agent_parameters import DqnAgentParameters
-from skipbo.model import ModelManager
 from skipbo.q_functions import QFunctions
-from skipbo.replay_buffer import ReplayBuffer
-from skipbo.state_transition import StateTransition
 
 
 class TrainedDqnAgent(Agent):
 
-    def __init__(self, name: str, model: Sequential):
+    def __init__(self, name: str, model):
+        """
+        The model can be a Keras model or a NumpyModel, or a QValueCache in front of either.
+        """
         super().__init__()
         self.name = name
         self.model = model
@@ -23,9 +18,8 @@ class TrainedDqnAgent(Agent):
         if reward != 0:
             self.episode_reward += reward
 
-        q_values = QFunctions.get_q_values(self.model, observation)
-        action = QFunctions.select_action_epsilon_greedy(q_values, 0, allowed_actions)
-        return action
+        action_mask = ActionMask.from_agent_arguments(allowed_actions, extra)
+        return QFunctions.get_best_action(self.model, observation, action_mask)
 
     def done(self, final_observation, reward):
         if reward != 0:
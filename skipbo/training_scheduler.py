@@ -0,0 +1,100 @@
+import time
+
+
+class TrainingScheduler:
+    """
+    Decides how many gradient steps an agent takes after each environment step.
+
+    By default it schedules gradient_steps_per_update gradient steps every train_every_x_steps environment steps.
+    When a replay ratio is given it schedules gradient steps such that the number of trained samples per environment
+    step (gradient steps * batch size / environment steps) follows that ratio instead. With train_at_episode_end the
+    scheduled gradient steps are deferred until the end of the episode.
+
+    Only environment steps for which training is possible (the replay buffer is filled up to training_start) count
+    towards the schedule.
+    """
+
+    def __init__(self, batch_size, train_every_x_steps=1, gradient_steps_per_update=1, replay_ratio=None,
+                 train_at_episode_end=False):
+        self.batch_size = batch_size
+        self.train_every_x_steps = train_every_x_steps
+        self.gradient_steps_per_update = gradient_steps_per_update
+        self.replay_ratio = replay_ratio
+        self.train_at_episode_end = train_at_episode_end
+        self.environment_steps = 0
+        self.training_environment_steps = 0
+        self.scheduled_gradient_steps = 0
+        self.deferred_gradient_steps = 0
+        self.gradient_steps = 0
+        self.report_time = time.perf_counter()
+        self.report_environment_steps = 0
+        self.report_gradient_steps = 0
+
+    def environment_step(self, can_train):
+        """
+        Register an environment step and return the number of gradient steps to take now.
+        """
+        self.environment_steps += 1
+        if not can_train:
+            return 0
+
+        self.training_environment_steps += 1
+        if self.replay_ratio is not None:
+            target_gradient_steps = int(self.training_environment_steps * self.replay_ratio / self.batch_size)
+            gradient_steps = target_gradient_steps - self.scheduled_gradient_steps
+        elif self.training_environment_steps % self.train_every_x_steps == 0:
+            gradient_steps = self.gradient_steps_per_update
+        else:
+            gradient_steps = 0
+        self.scheduled_gradient_steps += gradient_steps
+
+        if self.train_at_episode_end:
+            self.deferred_gradient_steps += gradient_steps
+            return 0
+        else:
+            self.gradient_steps += gradient_steps
+            return gradient_steps
+
+    def episode_end(self):
+        """
+        Return the number of deferred gradient steps to take at the end of an episode.
+        """
+        gradient_steps = self.deferred_gradient_steps
+        self.deferred_gradient_steps = 0
+        self.gradient_steps += gradient_steps
+        return gradient_steps
+
+    def get_state(self):
+        """
+        Return the counters of the schedule, to continue it with set_state after a restart.
+        """
+        return {
+            "environment_steps": self.environment_steps,
+            "training_environment_steps": self.training_environment_steps,
+            "scheduled_gradient_steps": self.scheduled_gradient_steps,
+            "deferred_gradient_steps": self.deferred_gradient_steps,
+            "gradient_steps": self.gradient_steps
+        }
+
+    def set_state(self, state):
+        self.environment_steps = state["environment_steps"]
+        self.training_environment_steps = state["training_environment_steps"]
+        self.scheduled_gradient_steps = state["scheduled_gradient_steps"]
+        self.deferred_gradient_steps = state["deferred_gradient_steps"]
+        self.gradient_steps = state["gradient_steps"]
+        self.report_time = time.perf_counter()
+        self.report_environment_steps = self.environment_steps
+        self.report_gradient_steps = self.gradient_steps
+
+    def report(self):
+        """
+        Return the environment steps and gradient steps per second since the previous report.
+        """
+        now = time.perf_counter()
+        elapsed = max(now - self.report_time, 1e-9)
+        steps_per_second = (self.environment_steps - self.report_environment_steps) / elapsed
+        updates_per_second = (self.gradient_steps - self.report_gradient_steps) / elapsed
+        self.report_time = now
+        self.report_environment_steps = self.environment_steps
+        self.report_gradient_steps = self.gradient_steps
+        return steps_per_second, updates_per_second
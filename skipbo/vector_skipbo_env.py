@@ -0,0 +1,68 @@
+import random
+
+import numpy as np
+
+from skipbo.action_mask import ActionMask
+from skipbo.game.skipbo_game import NR_OF_ACTIONS, SkipBoGame
+from skipbo.observation_encoder import OBSERVATION_SIZE, ObservationEncoder
+from skipbo.skipbo_env import SkipboEnv
+
+
+class VectorSkipboEnv:
+    """
+    Plays a number of independent Skip-Bo games in lockstep, so an agent can choose the actions for all games with
+    a single batched forward pass.
+
+    Every game is observed from the point of view of its current player, which is available in current_players.
+    Finished games are replaced by a new game automatically. With a seed the sequence of games (and so the results
+    for the same actions) is reproducible.
+    """
+
+    def __init__(self, nr_of_games, seed=None):
+        self.nr_of_games = nr_of_games
+        self.random = random.Random(seed)
+        self.games = [None] * nr_of_games
+        self.current_players = np.zeros(nr_of_games, dtype=np.int8)
+        self.game_lengths = np.zeros(nr_of_games, dtype=np.int32)
+
+    def reset(self):
+        """
+        Starts a new game for every slot and returns the stacked observations and legal action masks.
+        """
+        observations = np.empty((self.nr_of_games, OBSERVATION_SIZE), dtype=np.float32)
+        action_masks = np.empty((self.nr_of_games, NR_OF_ACTIONS), dtype=bool)
+        for index in range(self.nr_of_games):
+            self.__reset_game(index)
+            self.__observe(index, observations, action_masks)
+        return observations, action_masks
+
+    def step(self, actions):
+        """
+        Plays one action (in rl notation) in every game. Returns the stacked observations and legal action masks of
+        the current players, the rewards of both players per game (shape (nr_of_games, 2)) and the done flags.
+        The observation of a game that finished in this step is the first observation of its replacement game.
+        """
+        observations = np.empty((self.nr_of_games, OBSERVATION_SIZE), dtype=np.float32)
+        action_masks = np.empty((self.nr_of_games, NR_OF_ACTIONS), dtype=bool)
+        rewards = np.zeros((self.nr_of_games, 2), dtype=np.float32)
+        dones = np.zeros(self.nr_of_games, dtype=bool)
+
+        for index in range(self.nr_of_games):
+            rewards[index], dones[index] = SkipboEnv.play_action(self.games[index], int(actions[index]))
+            self.game_lengths[index] += 1
+            if dones[index]:
+                self.__reset_game(index)
+            self.__observe(index, observations, action_masks)
+
+        return observations, action_masks, rewards, dones
+
+    def __reset_game(self, index):
+        self.games[index] = SkipBoGame(self.random.getrandbits(64))
+        self.game_lengths[index] = 0
+
+    def __observe(self, index, observations, action_masks):
+        game = self.games[index]
+        player = game.current_player
+        self.current_players[index] = player
+        ObservationEncoder.encode(game, player, out=observations[index])
+        ActionMask.to_array(game.get_available_action_mask(player), out=action_masks[index])